@@ -0,0 +1,330 @@
+# api_server.py
+# Headless JSON API for the mobile app and SMS gateway: resource search, vCards and
+# crisis triage without a Streamlit session. One asyncio process serves every request
+# from the same in-memory catalog and indexes as psychiatrist_db_module.
+#
+# Run:  python api_server.py --port 8080
+#
+#   GET  /health
+#   GET  /search?q=delhi&country=India[&fuzzy=1][&type=hospital][&telehealth=1][&page=0&page_size=10]
+#        (fuzzy results are the best FUZZY_TOP_K matches; page until has_more is false)
+#   GET  /nearest?lat=28.6&lon=77.2[&k=10]        or  /nearest?postal=560001[&country=India]
+#   GET  /vcard?id=<result id>[&version=<catalog version>]
+#   GET  /triage?text=...     POST /triage {"text": "..."} or {"texts": ["...", ...]}
+#   GET  /stats
+#   GET  /metrics[?format=json]                   (collection on with --metrics or MINDCARE_METRICS=1)
+#   POST /import {"token": "...", "paths": ["providers.csv", ...][, "include_builtin": false]}
+#   GET  /import?job=<id>&token=...               (import routes exist only with --admin-token or
+#                                                  MINDCARE_ADMIN_TOKEN; paths are on the server)
+
+import argparse
+import asyncio
+import hmac
+import itertools
+import json
+import os
+from collections import OrderedDict
+from urllib.parse import parse_qs, urlsplit
+
+import metrics
+import psychiatrist_db_module as db
+import resource_importer
+from asset_cache import ASSETS
+from crisis_detector import default_detector
+
+MAX_BODY = 1 << 20
+MAX_PAGE_SIZE = 100
+MAX_IMPORT_JOBS = 20                   # finished import jobs kept for GET /import
+
+ADMIN_TOKEN = os.environ.get("MINDCARE_ADMIN_TOKEN")
+
+STATUS_TEXT = {200: "OK", 400: "Bad Request", 403: "Forbidden", 404: "Not Found", 405: "Method Not Allowed",
+               409: "Conflict", 413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def _param(params, name, default=None):
+    values = params.get(name)
+    return values[0] if values else default
+
+
+def _int_param(params, name, default):
+    try:
+        return int(_param(params, name, default))
+    except ValueError:
+        raise HTTPError(400, f"{name} must be an integer")
+
+
+def _float_param(params, name):
+    try:
+        return float(_param(params, name))
+    except (TypeError, ValueError):
+        raise HTTPError(400, f"{name} must be a number")
+
+
+def _flag(params, name):
+    return _param(params, name, "").lower() in ("1", "true", "yes")
+
+
+def _json_body(body):
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        raise HTTPError(400, "body must be JSON")
+    if not isinstance(payload, dict):
+        raise HTTPError(400, "body must be a JSON object")
+    return payload
+
+
+def _entry_json(r, distance_km=None):
+    item = {"id": getattr(r, "position", None), **dict(r)}
+    if distance_km is not None:
+        item["distance_km"] = round(distance_km, 2)
+    return item
+
+
+def _triage_json(result):
+    return {"tier": result.tier,
+            "matches": [{"phrase": m.phrase, "tier": m.tier, "language": m.language, "start": m.start}
+                        for m in result.matches]}
+
+
+# ---------------------------
+# Handlers: (params, body) -> JSON-able dict, or (content type, text)
+# ---------------------------
+def handle_health(params, body):
+    return {"status": "ok", "version": db.get_resource_index().version}
+
+
+def handle_search(params, body):
+    query = _param(params, "q", "").strip()
+    if not query:
+        raise HTTPError(400, "q is required")
+    country = _param(params, "country", "India")
+    page = max(0, _int_param(params, "page", 0))
+    page_size = min(MAX_PAGE_SIZE, max(1, _int_param(params, "page_size", 10)))
+    filters = {"type": params.get("type"), "telehealth": True if _flag(params, "telehealth") else None,
+               "state": params.get("state")}
+    if _flag(params, "fuzzy"):
+        # ranked matches are capped at FUZZY_TOP_K, so count is stable across pages
+        results = db.search_resources_fuzzy(query, country, top_k=db.FUZZY_TOP_K, filters=filters)
+        counts, fell_back = None, not results
+    else:
+        results, counts, fell_back = db.search_resources_faceted(query, country, filters)
+    start = page * page_size
+    return {
+        "version": db.get_resource_index().version,
+        "count": len(results),
+        "has_more": start + page_size < len(results),
+        "fell_back": fell_back,
+        "suggestions": db.suggest_locations(query) if fell_back else [],
+        "facets": {f: {str(v): n for v, n in values.items() if n} for f, values in counts.items()} if counts else None,
+        "results": [_entry_json(r) for r in results[start:start + page_size]],
+    }
+
+
+def handle_nearest(params, body):
+    k = min(MAX_PAGE_SIZE, max(1, _int_param(params, "k", 10)))
+    if _param(params, "postal"):
+        nearby = db.nearest_resources_to_postal_code(_param(params, "postal"), _param(params, "country"), k=k)
+    else:
+        nearby = db.nearest_resources(_float_param(params, "lat"), _float_param(params, "lon"), k=k)
+    return {"results": [_entry_json(r, km) for km, r in nearby]}
+
+
+def handle_vcard(params, body):
+    index = db.get_resource_index()
+    if _param(params, "version") and _int_param(params, "version", 0) != index.version:
+        raise HTTPError(409, "catalog version changed; search again")
+    pos = _int_param(params, "id", -1)
+    if not 0 <= pos < len(index.entries):
+        raise HTTPError(404, "no such resource")
+    return "text/vcard; charset=utf-8", db.make_vcard(index.entries[pos])
+
+
+def handle_triage(params, body):
+    detector = default_detector()
+    if body:
+        payload = _json_body(body)
+        if "texts" in payload:
+            texts = payload["texts"]
+            if not isinstance(texts, list) or not all(isinstance(t, str) for t in texts):
+                raise HTTPError(400, "texts must be a list of strings")
+            results = list(detector.scan_many(texts))
+            for r in results:
+                metrics.inc("mindcare_chat_screenings_total", tier=r.tier or "none")
+            return {"results": [_triage_json(r) for r in results]}
+        text = payload.get("text", "")
+    else:
+        text = _param(params, "text", "")
+    result = detector.scan(str(text))
+    metrics.inc("mindcare_chat_screenings_total", tier=result.tier or "none")
+    return _triage_json(result)
+
+
+def handle_stats(params, body):
+    return {"version": db.get_resource_index().version, "query_cache": db.query_cache_stats(),
+            "asset_cache": ASSETS.stats()}
+
+
+def handle_metrics(params, body):
+    if _param(params, "format") == "json":
+        return metrics.snapshot()
+    return "text/plain; version=0.0.4; charset=utf-8", metrics.render_prometheus()
+
+
+_import_jobs = OrderedDict()           # job id -> Future of resource_importer.import_catalog_async
+_import_ids = itertools.count(1)
+
+def _import_job_json(job, future):
+    if not future.done():
+        return {"job": job, "status": "running"}
+    error = future.exception()
+    if error is not None:
+        return {"job": job, "status": "failed", "error": f"{type(error).__name__}: {error}"}
+    return {"job": job, "status": "done", "report": future.result().as_dict()}
+
+
+def handle_import(params, body):
+    if not ADMIN_TOKEN:
+        raise HTTPError(404, "not found")
+    payload = _json_body(body) if body else {}
+    token = payload.get("token") or _param(params, "token") or ""
+    if not hmac.compare_digest(str(token).encode("utf-8"), ADMIN_TOKEN.encode("utf-8")):
+        raise HTTPError(403, "bad admin token")
+    if not body:
+        job = _int_param(params, "job", 0)
+        if job not in _import_jobs:
+            raise HTTPError(404, "no such import job")
+        return _import_job_json(job, _import_jobs[job])
+
+    paths = payload.get("paths")
+    if not isinstance(paths, list) or not paths or not all(isinstance(p, str) for p in paths):
+        raise HTTPError(400, "paths must be a non-empty list of strings")
+    job = next(_import_ids)
+    _import_jobs[job] = resource_importer.import_catalog_async(
+        paths, include_builtin=bool(payload.get("include_builtin", False)))
+    # forget the oldest finished jobs; running ones are always kept
+    for old in [j for j, f in _import_jobs.items() if f.done()][:max(0, len(_import_jobs) - MAX_IMPORT_JOBS)]:
+        del _import_jobs[old]
+    return _import_job_json(job, _import_jobs[job])
+
+
+ROUTES = {
+    "/health": (("GET",), handle_health),
+    "/search": (("GET",), handle_search),
+    "/nearest": (("GET",), handle_nearest),
+    "/vcard": (("GET",), handle_vcard),
+    "/triage": (("GET", "POST"), handle_triage),
+    "/stats": (("GET",), handle_stats),
+    "/metrics": (("GET",), handle_metrics),
+    "/import": (("GET", "POST"), handle_import),
+}
+
+
+def dispatch(method, target, body):
+    """Route one request; returns (status, content type, payload bytes)."""
+    url = urlsplit(target)
+    route = ROUTES.get(url.path)
+    timer = metrics.timer("mindcare_api_request_seconds", route=url.path if route else "other").start()
+    try:
+        if route is None:
+            raise HTTPError(404, "not found")
+        methods, handler = route
+        if method not in methods:
+            raise HTTPError(405, "method not allowed")
+        result = handler(parse_qs(url.query), body)
+        if isinstance(result, tuple):
+            content_type, text = result
+            return 200, content_type, text.encode("utf-8")
+        return 200, "application/json", json.dumps(result, ensure_ascii=False).encode("utf-8")
+    except HTTPError as e:
+        return e.status, "application/json", json.dumps({"error": str(e)}).encode("utf-8")
+    except Exception as e:
+        return 500, "application/json", json.dumps({"error": type(e).__name__}).encode("utf-8")
+    finally:
+        timer.stop()
+
+
+# ---------------------------
+# Minimal HTTP/1.1 server (keep-alive, Content-Length bodies)
+# ---------------------------
+async def handle_connection(reader, writer):
+    try:
+        while True:
+            try:
+                head = await reader.readuntil(b"\r\n\r\n")
+            except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                break
+            lines = head.decode("latin-1").split("\r\n")
+            try:
+                method, target, version = lines[0].split(" ", 2)
+            except ValueError:
+                break
+            headers = {}
+            for line in lines[1:]:
+                name, _, value = line.partition(":")
+                if name:
+                    headers[name.strip().lower()] = value.strip()
+
+            try:
+                length = int(headers.get("content-length", "0") or 0)
+            except ValueError:
+                break
+            if length > MAX_BODY:
+                status, content_type, payload = 413, "application/json", b'{"error": "body too large"}'
+                keep_alive = False
+            else:
+                body = (await reader.readexactly(length)).decode("utf-8", "replace") if length else ""
+                status, content_type, payload = dispatch(method.upper(), target, body)
+                connection = headers.get("connection", "").lower()
+                keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+
+            writer.write((f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}\r\n"
+                          f"Content-Type: {content_type}\r\n"
+                          f"Content-Length: {len(payload)}\r\n"
+                          f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n").encode("latin-1") + payload)
+            await writer.drain()
+            if not keep_alive:
+                break
+    except (asyncio.IncompleteReadError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(host="127.0.0.1", port=8080, warm=True):
+    if warm:
+        # build the shared indexes before accepting traffic
+        index = db.get_resource_index()
+        index.fuzzy, index.geo, index.facets
+        default_detector()
+    server = await asyncio.start_server(handle_connection, host, port)
+    print(f"MindCare API listening on http://{host}:{port}", flush=True)
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="MindCare headless JSON API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--catalog", nargs="*", default=[], help="provider dumps to import at startup")
+    parser.add_argument("--metrics", action="store_true", help="collect latency histograms and counters for /metrics")
+    parser.add_argument("--admin-token", default=ADMIN_TOKEN, help="enable /import for requests carrying this token")
+    args = parser.parse_args()
+
+    if args.metrics:
+        metrics.enable()
+    ADMIN_TOKEN = args.admin_token
+    if args.catalog:
+        print(json.dumps(resource_importer.import_catalog(args.catalog, include_builtin=True).as_dict()), flush=True)
+    try:
+        asyncio.run(serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
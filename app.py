@@ -9,6 +9,11 @@
 
 import streamlit as st
 
+import metrics
+from asset_cache import ASSETS, freeze, read_text
+from crisis_detector import default_detector
+from mood_tracker import MAX_SCORE, MIN_CODE_LENGTH, MIN_SCORE, default_tracker
+
 # ========================
 # CONFIG
 # ========================
@@ -18,40 +23,43 @@ st.set_page_config(
     layout="wide"
 )
 
-# Load custom CSS
-with open("style.css") as f:
-    st.markdown(f"<style>{f.read()}</style>", unsafe_allow_html=True)
+# Load custom CSS (read once per process, reloaded when style.css changes)
+st.markdown(f"<style>{read_text('style.css')}</style>", unsafe_allow_html=True)
 
 # ========================
 # DATABASE (India + USA sample)
 # ========================
-psychiatrists_db = {
-    "India": {
-        "Delhi": [
-            {"name": "Dr. Samir Parikh", "hospital": "Fortis Hospital, Delhi", "contact": "+91-9811111111"},
-            {"name": "Dr. Nand Kumar", "hospital": "AIIMS Delhi", "contact": "+91-9811222222"},
-        ],
-        "Maharashtra": [
-            {"name": "Dr. Anjali Chhabria", "hospital": "Mindtemple Clinic, Mumbai", "contact": "+91-9820000000"},
-            {"name": "Dr. Harish Shetty", "hospital": "L H Hiranandani Hospital, Mumbai", "contact": "+91-9820111111"},
-        ],
-    },
-    "USA": {
-        "California": [
-            {"name": "Dr. Laura Smith", "hospital": "Stanford Hospital, Palo Alto", "contact": "+1-650-123-4567"},
-            {"name": "Dr. John Doe", "hospital": "UCLA Medical Center, Los Angeles", "contact": "+1-310-987-6543"},
-        ],
-        "New York": [
-            {"name": "Dr. Emily Carter", "hospital": "NYU Langone, New York", "contact": "+1-212-333-4444"},
-            {"name": "Dr. Michael Johnson", "hospital": "Mount Sinai Hospital, New York", "contact": "+1-212-555-6666"},
-        ],
+def _load_psychiatrists_db():
+    return {
+        "India": {
+            "Delhi": [
+                {"name": "Dr. Samir Parikh", "hospital": "Fortis Hospital, Delhi", "contact": "+91-9811111111"},
+                {"name": "Dr. Nand Kumar", "hospital": "AIIMS Delhi", "contact": "+91-9811222222"},
+            ],
+            "Maharashtra": [
+                {"name": "Dr. Anjali Chhabria", "hospital": "Mindtemple Clinic, Mumbai", "contact": "+91-9820000000"},
+                {"name": "Dr. Harish Shetty", "hospital": "L H Hiranandani Hospital, Mumbai", "contact": "+91-9820111111"},
+            ],
+        },
+        "USA": {
+            "California": [
+                {"name": "Dr. Laura Smith", "hospital": "Stanford Hospital, Palo Alto", "contact": "+1-650-123-4567"},
+                {"name": "Dr. John Doe", "hospital": "UCLA Medical Center, Los Angeles", "contact": "+1-310-987-6543"},
+            ],
+            "New York": [
+                {"name": "Dr. Emily Carter", "hospital": "NYU Langone, New York", "contact": "+1-212-333-4444"},
+                {"name": "Dr. Michael Johnson", "hospital": "Mount Sinai Hospital, New York", "contact": "+1-212-555-6666"},
+            ],
+        }
     }
-}
+
+# Shared read-only copy; rebuilt only when app.py itself changes
+psychiatrists_db = ASSETS.get("psychiatrists_db", lambda: freeze(_load_psychiatrists_db()), sources=(__file__,))
 
 # ========================
 # NAVIGATION
 # ========================
-menu = ["🏠 Home", "💬 Chatbot", "🧑‍⚕️ Find Psychiatrists",
+menu = ["🏠 Home", "💬 Chatbot", "📈 Mood Tracker", "🧑‍⚕️ Find Psychiatrists",
         "📚 Resources", "🚨 Emergency", "ℹ️ About"]
 
 choice = st.sidebar.radio("Navigate", menu)
@@ -60,6 +68,8 @@ choice = st.sidebar.radio("Navigate", menu)
 # PAGES
 # ========================
 
+render_timer = metrics.timer("mindcare_page_render_seconds", page=choice.split(" ", 1)[-1]).start()
+
 # ---- HOME ----
 if choice == "🏠 Home":
     st.title("🏠 Welcome to MindCare")
@@ -68,6 +78,7 @@ if choice == "🏠 Home":
 
     ### What you can do here:
     - Talk to a **mental health chatbot** 🤖  
+    - Track your **daily mood** and see how it changes 📈  
     - Find **psychiatrists near you** (India + USA) 🧑‍⚕️  
     - Access **resources and self-help guides** 📚  
     - Get **emergency support instantly** 🚨  
@@ -79,10 +90,13 @@ elif choice == "💬 Chatbot":
     user_input = st.text_input("How are you feeling today?")
 
     if st.button("Submit") and user_input:
-        if "suicide" in user_input.lower() or "kill myself" in user_input.lower():
+        with metrics.timer("mindcare_chat_classify_seconds"):
+            screening = default_detector().scan(user_input)
+        metrics.inc("mindcare_chat_screenings_total", tier=screening.tier or "none")
+        if screening.tier == "crisis":
             st.error("🚨 Urgent! If you're in danger, call emergency immediately.")
             st.warning("👉 Go to Emergency Page from sidebar.")
-        elif "stress" in user_input.lower() or "anxiety" in user_input.lower():
+        elif screening.tier == "distress":
             st.info("😟 It sounds like you're stressed. Try this simple exercise:")
             st.markdown("""
             **🌬️ Breathing Exercise (2 min)**
@@ -94,6 +108,54 @@ elif choice == "💬 Chatbot":
         else:
             st.success("💙 Thank you for sharing. Talking is the first step towards healing.")
 
+# ---- MOOD TRACKER ----
+elif choice == "📈 Mood Tracker":
+    import secrets
+    from datetime import date, timedelta
+
+    st.title("📈 Mood Tracker")
+    tracker = default_tracker()
+    # check-ins are keyed on a random per-session code, never on a name someone else could type
+    if "mood_code" not in st.session_state:
+        st.session_state["mood_code"] = secrets.token_urlsafe(16)
+    with st.expander("🔑 Your private mood code"):
+        st.caption("Your check-ins are saved on the MindCare server under this code, not under your name. "
+                   "Keep it private and enter it here on a later visit to see your history again.")
+        st.code(st.session_state["mood_code"])
+        restored = st.text_input("Have a code from an earlier visit?", type="password", key="mood_restore").strip()
+        if restored and st.button("Use this code"):
+            if len(restored) >= MIN_CODE_LENGTH:
+                st.session_state["mood_code"] = restored
+                st.rerun()
+            st.error("That doesn't look like a MindCare mood code.")
+    user_id = st.session_state["mood_code"]
+
+    score = st.slider("How is your mood today?", MIN_SCORE, MAX_SCORE, 5)
+    note = st.text_input("Anything you'd like to note? (optional)")
+    if st.button("Log mood"):
+        tracker.log(user_id, score, note)
+        st.success("💙 Logged. Thank you for checking in.")
+
+    summary = tracker.summary(user_id)
+    if summary["entries"]:
+        fmt = lambda v: "—" if v is None else f"{v:.1f}"
+        c1, c2, c3, c4 = st.columns(4)
+        c1.metric("7-day average", fmt(summary["avg_7"]))
+        c2.metric("30-day average", fmt(summary["avg_30"]))
+        c3.metric("Current streak", f"{summary['streak']} day(s)")
+        c4.metric("Best streak", f"{summary['best_streak']} day(s)")
+        for alert in summary["alerts"]:
+            st.warning(f"⚠️ {alert}")
+        if summary["alerts"]:
+            st.info("👉 The Emergency page in the sidebar lists helplines you can call any time.")
+
+        days = st.radio("Show", [30, 90, 365], horizontal=True, format_func=lambda d: f"{d} days")
+        series = tracker.daily_series(user_id, date.today() - timedelta(days=days - 1))
+        if series:
+            st.line_chart({"date": [d for d, _ in series], "mood": [m for _, m in series]}, x="date", y="mood")
+    else:
+        st.caption("No check-ins yet. Log your first mood above.")
+
 # ---- PSYCHIATRISTS ----
 elif choice == "🧑‍⚕️ Find Psychiatrists":
     st.title("🧑‍⚕️ Find Psychiatrists Near You")
@@ -144,3 +206,13 @@ elif choice == "ℹ️ About":
     It is **not a substitute for professional medical advice**.  
     Always consult a licensed doctor or psychiatrist for serious concerns.  
     """)
+
+    with st.expander("Diagnostics"):
+        st.caption("Static asset cache (per server process)")
+        st.json(ASSETS.stats())
+        if metrics.enabled():
+            st.caption("Metrics (per server process)")
+            st.json(metrics.snapshot())
+
+render_timer.stop()
+metrics.maybe_flush()
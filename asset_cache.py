@@ -0,0 +1,74 @@
+# asset_cache.py
+# Process-wide cache for static data and assets (CSS, sample DBs) shared by every
+# Streamlit session. Streamlit re-executes app.py on each widget interaction; values
+# here are loaded once per process and reloaded only when their source files change.
+
+import os
+import threading
+from types import MappingProxyType
+
+
+def freeze(obj):
+    """Read-only copy of nested dicts/lists, safe to share across sessions."""
+    if isinstance(obj, dict):
+        return MappingProxyType({k: freeze(v) for k, v in obj.items()})
+    if isinstance(obj, (list, tuple)):
+        return tuple(freeze(v) for v in obj)
+    return obj
+
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+class AssetCache:
+    """Values keyed by name, invalidated when any of their source files' mtime changes."""
+
+    def __init__(self):
+        self._entries = {}         # key -> (source stamp, value)
+        self._lock = threading.Lock()
+        self._hits = {}
+        self._misses = {}
+
+    def get(self, key, loader, sources=()):
+        stamp = tuple(_mtime(p) for p in sources)
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == stamp:
+            self._hits[key] = self._hits.get(key, 0) + 1
+            return entry[1]
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == stamp:
+                self._hits[key] = self._hits.get(key, 0) + 1
+                return entry[1]
+            value = loader()
+            self._entries[key] = (stamp, value)
+            self._misses[key] = self._misses.get(key, 0) + 1
+            return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        keys = sorted(set(self._hits) | set(self._misses), key=str)
+        return {
+            "hits": sum(self._hits.values()),
+            "misses": sum(self._misses.values()),
+            "entries": len(self._entries),
+            "by_key": {str(k): {"hits": self._hits.get(k, 0), "misses": self._misses.get(k, 0)} for k in keys},
+        }
+
+
+ASSETS = AssetCache()
+
+
+def read_text(path: str) -> str:
+    """File contents, read once per process and again only after the file changes."""
+    def load():
+        with open(path, encoding="utf-8") as f:
+            return f.read()
+    return ASSETS.get(("text", os.path.abspath(path)), load, sources=(path,))
@@ -0,0 +1,308 @@
+# benchmark.py
+# Reproducible benchmarks over synthetic data: provider catalogs of 1k / 100k / 1M rows in
+# the import schema (built through resource_importer and installed with install_catalog)
+# and synthetic chat corpora. Times import, index builds, location search (hits, misses,
+# fallbacks; cached and uncached), fuzzy search, normalize, vCard/CSV export and crisis
+# screening, and records memory. Results go to a JSON file for comparison between commits.
+#
+#   python benchmark.py -o bench_new.json                     (1k, 100k and 1M rows)
+#   python benchmark.py --sizes 1k 100k --compare bench_old.json -o bench_new.json
+
+import argparse
+import csv
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import psychiatrist_db_module as db
+import resource_export
+import resource_importer
+from crisis_detector import DEFAULT_PHRASES, CrisisDetector
+from resource_index import normalize
+
+DEFAULT_SIZES = ("1k", "100k", "1m")
+MIN_SAMPLE_TIME = 0.2                  # seconds per timing sample
+SAMPLES = 5
+
+# install_catalog() replaces the module-level dicts with the live catalog, so keep the
+# built-in entries to reset to before each size (otherwise earlier imports pile up)
+BUILTIN_INDIA = dict(db.INDIA_STATE_RESOURCES)
+BUILTIN_USA = dict(db.USA_STATE_RESOURCES)
+
+SYLLABLES = ["ka", "ra", "pur", "na", "ga", "bad", "dha", "li", "ko", "var", "sa", "ton", "vil",
+             "ber", "mo", "chi", "la", "den", "ha", "ri", "nag", "ore", "ston", "field"]
+FILLER = {
+    "en": ["today", "work", "was", "long", "and", "I", "feel", "tired", "my", "friend", "called", "maybe",
+           "tomorrow", "will", "be", "better", "exams", "are", "coming", "family", "dinner", "the", "weekend"],
+    "hi": ["aaj", "kaam", "bahut", "tha", "main", "thak", "gaya", "dost", "ghar", "kal", "accha", "hoga",
+           "परीक्षा", "परिवार", "आज", "दिन"],
+    "es": ["hoy", "trabajo", "fue", "largo", "y", "me", "siento", "cansado", "mi", "amigo", "mañana", "mejor"],
+}
+
+
+def parse_size(text: str) -> int:
+    text = text.strip().lower()
+    scale = {"k": 1_000, "m": 1_000_000}.get(text[-1:], 1)
+    return int(float(text[:-1] if scale > 1 else text) * scale)
+
+
+# ---------------------------
+# Synthetic data
+# ---------------------------
+def synthetic_cities(rng, count):
+    names = set()
+    while len(names) < count:
+        name = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4)))
+        names.add(name.capitalize())
+    return sorted(names)
+
+def synthetic_rows(n, seed=0):
+    """
+    n raw provider rows (import schema, with country) spread over the real Indian and US
+    states and about n / 50 synthetic cities. Deterministic for a given seed.
+    """
+    rng = random.Random(seed)
+    india_states = list(BUILTIN_INDIA)
+    cities = [(city, "India" if rng.random() < 0.7 else "USA") for city in synthetic_cities(rng, max(20, n // 50))]
+    city_state = {city: rng.choice(india_states if country == "India" else db.US_STATES) for city, country in cities}
+    for i in range(n):
+        city, country = cities[rng.randrange(len(cities))]
+        kind = rng.choice(db.ENTRY_TYPES)
+        row = {
+            "country": country,
+            "name": f"{city} {kind.title()} {i}",
+            "type": kind,
+            "phone": f"+{91 if country == 'India' else 1}-{rng.randrange(10**9, 10**10)}",
+            "address": f"{rng.randint(1, 999)} Main Road, {city}",
+            "city": city,
+            "state": city_state[city],
+            "telehealth_url": f"https://telehealth.example/{i}" if rng.random() < 0.3 else "",
+            "notes": "",
+        }
+        if rng.random() < 0.8:
+            lat, lon = (rng.uniform(8, 35), rng.uniform(68, 97)) if country == "India" else (rng.uniform(25, 49), rng.uniform(-124, -67))
+            row["lat"], row["lon"] = f"{lat:.5f}", f"{lon:.5f}"
+        yield row
+
+def write_rows_csv(path, rows):
+    fields = ["country", *db.ENTRY_FIELDS, "lat", "lon"]
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fields)
+        writer.writeheader()
+        writer.writerows(rows)
+
+def chat_corpus(n, seed=0, crisis_rate=0.02, distress_rate=0.1):
+    """n synthetic chat messages in en/hi/es; a small share contain crisis or distress phrases."""
+    rng = random.Random(seed)
+    languages = list(FILLER)
+    messages = []
+    for _ in range(n):
+        language = rng.choice(languages)
+        words = [rng.choice(FILLER[language]) for _ in range(rng.randint(4, 30))]
+        roll = rng.random()
+        tier = "crisis" if roll < crisis_rate else "distress" if roll < crisis_rate + distress_rate else None
+        if tier:
+            words.insert(rng.randrange(len(words) + 1), rng.choice(DEFAULT_PHRASES[tier][language]))
+        messages.append(" ".join(words))
+    return messages
+
+
+# ---------------------------
+# Measurement
+# ---------------------------
+def rss_mb():
+    """Current resident set size in MB (Linux), else peak RSS."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError, AttributeError):
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2**20 if sys.platform == "darwin" else peak / 1024
+
+def time_once(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+def time_calls(fn, items):
+    """
+    Time fn over every item in items, repeated until a sample takes MIN_SAMPLE_TIME.
+    Returns per-call seconds (min and median over SAMPLES samples).
+    """
+    loops = 1
+    while True:
+        elapsed, _ = time_once(lambda: [fn(x) for _ in range(loops) for x in items])
+        if elapsed >= MIN_SAMPLE_TIME or loops >= 1 << 20:
+            break
+        loops *= 2
+    samples = [elapsed] + [time_once(lambda: [fn(x) for _ in range(loops) for x in items])[0]
+                           for _ in range(SAMPLES - 1)]
+    calls = loops * len(items)
+    return {"calls": len(items), "per_call_us_min": min(samples) / calls * 1e6,
+            "per_call_us_median": statistics.median(samples) / calls * 1e6}
+
+
+class CountingSink:
+    """Write-only binary sink that only counts bytes."""
+
+    def __init__(self):
+        self.bytes = 0
+
+    def write(self, data):
+        self.bytes += len(data)
+        return len(data)
+
+
+# ---------------------------
+# Suites
+# ---------------------------
+def search_queries(n, seed=0):
+    """(kind, [(query, country)]) query sets for the catalog synthetic_rows(n, seed) builds."""
+    rng = random.Random(seed)
+    sample = [row for row, _ in zip(synthetic_rows(n, seed), range(2000))]
+    picks = [sample[rng.randrange(len(sample))] for _ in range(50)]
+    return {
+        "hit_state": [(s.lower(), "India") for s in list(BUILTIN_INDIA)[:10]] +
+                     [(s.lower(), "USA") for s in db.US_STATES[:10]],
+        "hit_city": [(r["city"].lower(), r["country"]) for r in picks],
+        "hit_phrase": [(f"psychiatrist in {r['city']}", r["country"]) for r in picks],
+        "miss_fallback_india": [(f"qx{i}zv", "India") for i in range(20)],
+        "miss_fallback_usa": [(f"chicago qx{i}", "India") for i in range(20)],
+        "miss_usa_hint": [(f"qx{i}zv", "USA") for i in range(20)],
+    }
+
+def bench_catalog(n, seed, workdir):
+    results = {"rows": n}
+    path = os.path.join(workdir, f"catalog_{n}.csv")
+    results["generate_s"], _ = time_once(lambda: write_rows_csv(path, synthetic_rows(n, seed)))
+    results["csv_mb"] = os.path.getsize(path) / 2**20
+
+    db.install_catalog(BUILTIN_INDIA, BUILTIN_USA, warm=False)
+    rss_before = rss_mb()
+    results["import_s"], report = time_once(lambda: resource_importer.import_catalog([path], include_builtin=True, warm=False))
+    os.remove(path)
+    index = db.get_resource_index()
+    results["accepted"] = report.accepted
+    results["entries"] = len(index.entries)
+    results["memory"] = {"rss_before_mb": rss_before, "rss_after_import_mb": rss_mb(),
+                         "table_column_mb": index.table.nbytes() / 2**20,
+                         "pooled_strings": len(index.table.pool)}
+    for name in ("facets", "geo", "fuzzy"):
+        results[f"build_{name}_s"], _ = time_once(lambda: getattr(index, name))
+    results["memory"]["rss_after_indexes_mb"] = rss_mb()
+
+    search = {}
+    query_sets = search_queries(n, seed)
+    db.QUERY_CACHE.clear()
+    for kind, queries in query_sets.items():
+        uncached = time_calls(lambda qc: len(db.search_resources_by_location(*qc)), queries)
+        cached = time_calls(lambda qc: len(db.search_resources_cached(*qc)), queries)
+        search[kind] = {"uncached": uncached, "cached": cached,
+                        "mean_results": statistics.mean(len(db.search_resources_cached(*qc)) for qc in queries)}
+    fuzzy_queries = [(q[:-1] + "x" if len(q) > 4 else q, c) for q, c in query_sets["hit_city"][:20]]
+    search["fuzzy"] = time_calls(lambda qc: len(db.search_resources_fuzzy(qc[0], qc[1])), fuzzy_queries)
+    search["normalize"] = time_calls(normalize, [q for q, _ in query_sets["hit_phrase"]])
+    results["search"] = search
+
+    entries = index.entries
+    results["make_vcard"] = time_calls(db.make_vcard, [entries[i] for i in range(0, len(entries), max(1, len(entries) // 200))])
+    export = {}
+    for fmt in resource_export.FORMATS:
+        sink = CountingSink()
+        elapsed, count = time_once(lambda: resource_export.write_export(sink, resource_export.region_entries(), fmt))
+        export[fmt] = {"entries": count, "seconds": elapsed, "mb": sink.bytes / 2**20,
+                       "entries_per_s": count / elapsed if elapsed else None}
+    results["export"] = export
+    results["memory"]["rss_end_mb"] = rss_mb()
+    return results
+
+def bench_crisis(sizes, seed):
+    build_s, detector = time_once(CrisisDetector)
+    results = {"build_s": build_s}
+    for n in sizes:
+        corpus = chat_corpus(n, seed)
+        elapsed, screened = time_once(lambda: list(detector.scan_many(corpus)))
+        tiers = {}
+        for r in screened:
+            tiers[r.tier or "none"] = tiers.get(r.tier or "none", 0) + 1
+        results[str(n)] = {"messages": n, "seconds": elapsed, "messages_per_s": n / elapsed if elapsed else None,
+                           "tiers": tiers}
+    results["scan"] = time_calls(detector.scan, chat_corpus(200, seed))
+    return results
+
+
+# ---------------------------
+# Reporting
+# ---------------------------
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+def flatten(obj, prefix=""):
+    """{'a.b.c': number} for every numeric leaf, used by --compare."""
+    flat = {}
+    if isinstance(obj, dict):
+        for k, v in obj.items():
+            flat.update(flatten(v, f"{prefix}{k}."))
+    elif isinstance(obj, (int, float)) and not isinstance(obj, bool):
+        flat[prefix[:-1]] = obj
+    return flat
+
+def compare(old, new, out=sys.stderr):
+    """Print timing ratios new/old for matching keys (>1 means slower)."""
+    old_flat, new_flat = flatten(old.get("catalogs", {})), flatten(new.get("catalogs", {}))
+    old_flat.update(flatten(old.get("crisis", {}), "crisis."))
+    new_flat.update(flatten(new.get("crisis", {}), "crisis."))
+    print(f"{'metric':70s} {'old':>12s} {'new':>12s}  ratio", file=out)
+    for key in sorted(set(old_flat) & set(new_flat)):
+        timing = key.endswith("seconds") or "per_call_us" in key or (key.endswith("_s") and not key.endswith("per_s"))
+        if timing and old_flat[key]:
+            ratio = new_flat[key] / old_flat[key]
+            flag = "  <-- slower" if ratio > 1.2 else "  <-- faster" if ratio < 0.8 else ""
+            print(f"{key:70s} {old_flat[key]:12.4f} {new_flat[key]:12.4f} {ratio:6.2f}x{flag}", file=out)
+
+def run(sizes, seed=0, chat_sizes=(1_000, 100_000)):
+    report = {
+        "meta": {"commit": git_commit(), "python": platform.python_version(), "platform": platform.platform(),
+                 "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"), "seed": seed, "sizes": list(sizes)},
+        "catalogs": {},
+    }
+    with tempfile.TemporaryDirectory() as workdir:
+        for n in sizes:
+            print(f"catalog {n} rows...", file=sys.stderr, flush=True)
+            report["catalogs"][str(n)] = bench_catalog(n, seed, workdir)
+    print("crisis screening...", file=sys.stderr, flush=True)
+    report["crisis"] = bench_crisis(chat_sizes, seed)
+    report["meta"]["peak_rss_mb"] = rss_mb()
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark search, export and crisis screening on synthetic data.")
+    parser.add_argument("--sizes", nargs="+", default=list(DEFAULT_SIZES), help="catalog sizes, e.g. 1k 100k 1m")
+    parser.add_argument("--chat-sizes", nargs="+", default=["1k", "100k"], help="chat corpus sizes")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--compare", help="earlier benchmark JSON to compare against")
+    parser.add_argument("-o", "--output", help="write the JSON report here (default: stdout)")
+    args = parser.parse_args()
+
+    result = run([parse_size(s) for s in args.sizes], args.seed, [parse_size(s) for s in args.chat_sizes])
+    text = json.dumps(result, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            compare(json.load(f), result)
@@ -0,0 +1,182 @@
+# crisis_detector.py
+# Multi-pattern crisis classification for chatbot messages.
+# All risk phrases are compiled once into an Aho-Corasick automaton, so each message
+# is scanned in a single pass no matter how many phrases or languages are loaded.
+#
+# Phrase file format (JSON): { "<tier>": { "<language>": ["phrase", ...] } }
+# Tiers are ordered most to least severe in SEVERITY_TIERS.
+
+import json
+import sys
+from collections import deque
+from typing import NamedTuple
+
+SEVERITY_TIERS = ("crisis", "distress")
+
+DEFAULT_PHRASES = {
+    "crisis": {
+        "en": ["suicide", "suicidal", "kill myself", "end my life", "want to die", "better off dead",
+               "self harm", "self-harm", "hurt myself", "cut myself", "no reason to live", "take my own life"],
+        "hi": ["आत्महत्या", "खुद को मार", "मरना चाहता", "मरना चाहती", "jeena nahi chahta", "jeena nahi chahti",
+               "marna chahta", "marna chahti", "khudkushi"],
+        "es": ["suicidio", "suicidarme", "matarme", "quiero morir", "quitarme la vida"],
+    },
+    "distress": {
+        "en": ["stress", "distress", "overstress", "anxiety", "anxious", "panic", "overwhelmed", "depressed", "hopeless",
+               "can't sleep", "cannot sleep", "lonely", "worthless"],
+        "hi": ["तनाव", "चिंता", "घबराहट", "tanav", "chinta", "ghabrahat", "akela"],
+        "es": ["estrés", "estres", "ansiedad", "pánico", "deprimido", "deprimida", "sin esperanza"],
+    },
+}
+
+
+# Curly single quotes are matched as "'", so "can’t sleep" hits "can't sleep"
+_QUOTES = str.maketrans({"\u2018": "'", "\u2019": "'"})
+
+def _fold(text: str) -> str:
+    return text.casefold().translate(_QUOTES)
+
+
+class PhraseMatch(NamedTuple):
+    phrase: str
+    tier: str
+    language: str
+    start: int           # offset into the original message
+
+
+class CrisisResult(NamedTuple):
+    tier: str            # most severe matched tier, or None
+    matches: tuple       # PhraseMatch, in text order
+
+    @property
+    def is_crisis(self) -> bool:
+        return self.tier == SEVERITY_TIERS[0]
+
+
+class CrisisDetector:
+    """
+    Aho-Corasick automaton over every (tier, language, phrase).
+    Matching is case-insensitive, ‘ and ’ count as ', runs of whitespace count as one space, and a phrase
+    must start at a word boundary, so "stress" matches "stressed" but not the middle of
+    "mistress" ("distress" is listed on its own).
+    """
+
+    def __init__(self, phrases=None, tiers=SEVERITY_TIERS):
+        phrases = DEFAULT_PHRASES if phrases is None else phrases
+        self.tiers = tuple(tiers) + tuple(t for t in phrases if t not in tiers)
+        self._rank = {t: i for i, t in enumerate(self.tiers)}
+        self._patterns = []            # (phrase, tier, language, folded length)
+        self._goto = [{}]              # state -> {char: state}
+        self._fail = [0]
+        self._out = [()]               # state -> pattern ids ending here
+
+        for tier, by_language in phrases.items():
+            for language, items in by_language.items():
+                for phrase in items:
+                    folded = " ".join(_fold(phrase).split())
+                    if folded:
+                        self._add(folded, (phrase, tier, language, len(folded)))
+        self._link()
+
+    @classmethod
+    def from_json(cls, path):
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def __len__(self):
+        return len(self._patterns)
+
+    def _add(self, folded, pattern):
+        state = 0
+        for ch in folded:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(())
+            state = nxt
+        self._out[state] += (len(self._patterns),)
+        self._patterns.append(pattern)
+
+    def _link(self):
+        # breadth-first failure links; outputs inherit from their failure state
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                f = self._fail[state]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                self._fail[nxt] = self._goto[f].get(ch, 0) if state else 0
+                self._out[nxt] += self._out[self._fail[nxt]]
+
+    def scan(self, text: str) -> CrisisResult:
+        """Classify one message in a single pass over its characters."""
+        text = text if isinstance(text, str) else ""
+        folded = _fold(text)
+        # casefold can expand a character ("ß" -> "ss"); then map folded offsets back to text
+        origin = None if len(folded) == len(text) else [i for i, ch in enumerate(text) for _ in _fold(ch)]
+        goto, fail, out, patterns = self._goto, self._fail, self._out, self._patterns
+        state = 0
+        matches = []
+        fed = []                       # folded offset of each character fed to the automaton
+        for i, ch in enumerate(folded):
+            if ch.isspace():
+                if fed and folded[fed[-1]].isspace():
+                    continue           # "kill  myself" scans as "kill myself"
+                ch = " "
+            fed.append(i)
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for pid in out[state]:
+                phrase, tier, language, length = patterns[pid]
+                start = fed[-length]
+                if start == 0 or not folded[start - 1].isalnum():
+                    matches.append(PhraseMatch(phrase, tier, language, origin[start] if origin else start))
+        if not matches:
+            return CrisisResult(None, ())
+        matches.sort(key=lambda m: m.start)
+        tier = min((m.tier for m in matches), key=self._rank.__getitem__)
+        return CrisisResult(tier, tuple(matches))
+
+    def scan_many(self, texts):
+        """Classify an iterable of messages (e.g. an archived transcript); yields CrisisResult."""
+        scan = self.scan
+        for text in texts:
+            yield scan(text)
+
+
+_default = None
+
+def default_detector() -> CrisisDetector:
+    """Process-wide detector over DEFAULT_PHRASES, compiled on first use."""
+    global _default
+    if _default is None:
+        _default = CrisisDetector()
+    return _default
+
+
+# Re-screen archived transcripts: python crisis_detector.py transcript.txt [--phrases phrases.json]
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Screen messages (one per line) for crisis phrases.")
+    parser.add_argument("files", nargs="*", help="transcript files; stdin if omitted")
+    parser.add_argument("--phrases", help="JSON phrase file (defaults to the built-in lists)")
+    args = parser.parse_args()
+
+    detector = CrisisDetector.from_json(args.phrases) if args.phrases else default_detector()
+    counts = {tier: 0 for tier in detector.tiers}
+    streams = [open(p, encoding="utf-8") for p in args.files] or [sys.stdin]
+    for stream in streams:
+        with stream:
+            for lineno, result in enumerate(detector.scan_many(stream), 1):
+                if result.tier:
+                    counts[result.tier] += 1
+                    phrases = ", ".join(m.phrase for m in result.matches)
+                    print(f"{getattr(stream, 'name', '-')}:{lineno}\t{result.tier}\t{phrases}")
+    print(json.dumps(counts), file=sys.stderr)
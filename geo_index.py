@@ -0,0 +1,246 @@
+# geo_index.py
+# Spatial index for "nearest help" lookups over resource entries with lat/lon.
+# Points are stored as unit vectors in a KD-tree with bounding boxes, so k-nearest
+# and radius queries visit a handful of leaves instead of every provider.
+
+import math
+from bisect import bisect_right
+from heapq import heappop, heappush, heapreplace
+
+EARTH_RADIUS_KM = 6371.0088
+LEAF_SIZE = 16
+
+
+def _unit_vector(lat, lon):
+    phi, lam = math.radians(lat), math.radians(lon)
+    return (math.cos(phi) * math.cos(lam), math.cos(phi) * math.sin(lam), math.sin(phi))
+
+
+def _chord2_to_km(d2):
+    return 2.0 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(d2) / 2.0))
+
+
+def _km_to_chord2(km):
+    return (2.0 * math.sin(min(km / EARTH_RADIUS_KM, math.pi) / 2.0)) ** 2
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    a, b = _unit_vector(lat1, lon1), _unit_vector(lat2, lon2)
+    return _chord2_to_km(sum((x - y) ** 2 for x, y in zip(a, b)))
+
+
+def coordinates(entry):
+    """(lat, lon) of an entry, or None if it carries no usable coordinates."""
+    lat, lon = entry.get("lat"), entry.get("lon")
+    if lat is None or lon is None or lat == "" or lon == "":
+        return None
+    try:
+        lat, lon = float(lat), float(lon)
+    except (TypeError, ValueError):
+        return None
+    if -90.0 <= lat <= 90.0 and -180.0 <= lon <= 180.0:
+        return lat, lon
+    return None
+
+
+class GeoIndex:
+    """
+    KD-tree over (position, lat, lon) points. Leaves hold up to LEAF_SIZE points stored
+    contiguously; every node keeps a bounding box used to prune both query types.
+    """
+
+    def __init__(self, points):
+        pos, cx, cy, cz = [], [], [], []
+        for p, lat, lon in points:
+            x, y, z = _unit_vector(lat, lon)
+            pos.append(p)
+            cx.append(x)
+            cy.append(y)
+            cz.append(z)
+        self.positions = []
+        self.xyz = ([], [], [])
+        self._lo, self._hi = [], []            # point range per node
+        self._left, self._right = [], []       # child node ids, -1 for leaves
+        self._box = []                         # (minx, maxx, miny, maxy, minz, maxz) per node
+        if pos:
+            self._build(pos, (cx, cy, cz))
+
+    def __len__(self):
+        return len(self.positions)
+
+    def _build(self, pos, coords):
+        stack = [(list(range(len(pos))), None, False)]   # (point ids, parent node, is right child)
+        while stack:
+            ids, parent, right = stack.pop()
+            node = len(self._lo)
+            box = []
+            for axis in range(3):
+                values = list(map(coords[axis].__getitem__, ids))
+                box += (min(values), max(values))
+            self._box.append(tuple(box))
+            self._left.append(-1)
+            self._right.append(-1)
+            if parent is not None:
+                (self._right if right else self._left)[parent] = node
+            if len(ids) <= LEAF_SIZE:
+                self._lo.append(len(self.positions))
+                self.positions.extend(map(pos.__getitem__, ids))
+                for axis in range(3):
+                    self.xyz[axis].extend(map(coords[axis].__getitem__, ids))
+                self._hi.append(len(self.positions))
+                continue
+            self._lo.append(-1)
+            self._hi.append(-1)
+            axis = max(range(3), key=lambda a: box[2 * a + 1] - box[2 * a])
+            ids.sort(key=coords[axis].__getitem__)
+            mid = len(ids) // 2
+            # push right first so leaves come out in left-to-right order
+            stack.append((ids[mid:], node, True))
+            stack.append((ids[:mid], node, False))
+
+    def _box_dist2(self, node, q):
+        box = self._box[node]
+        d2 = 0.0
+        for axis in range(3):
+            lo, hi, c = box[2 * axis], box[2 * axis + 1], q[axis]
+            if c < lo:
+                d2 += (lo - c) ** 2
+            elif c > hi:
+                d2 += (c - hi) ** 2
+        return d2
+
+    def nearest(self, lat, lon, k=10, radius_km=None):
+        """[(distance_km, position)] of the k nearest points, closest first, optionally within radius_km."""
+        if not self.positions or k <= 0:
+            return []
+        q = _unit_vector(lat, lon)
+        qx, qy, qz = q
+        xs, ys, zs = self.xyz
+        limit = _km_to_chord2(radius_km) if radius_km is not None else float("inf")
+        best = []                              # max-heap of (-d2, position)
+        frontier = [(0.0, 0)]
+        while frontier:
+            d2, node = heappop(frontier)
+            bound = -best[0][0] if len(best) == k else limit
+            if d2 > bound:
+                break
+            if self._left[node] == -1:
+                for i in range(self._lo[node], self._hi[node]):
+                    p2 = (xs[i] - qx) ** 2 + (ys[i] - qy) ** 2 + (zs[i] - qz) ** 2
+                    if p2 > limit:
+                        continue
+                    if len(best) < k:
+                        heappush(best, (-p2, self.positions[i]))
+                    elif p2 < -best[0][0]:
+                        heapreplace(best, (-p2, self.positions[i]))
+                continue
+            for child in (self._left[node], self._right[node]):
+                heappush(frontier, (self._box_dist2(child, q), child))
+        return [(_chord2_to_km(-d2), pos) for d2, pos in sorted(best, reverse=True)]
+
+    def within(self, lat, lon, radius_km):
+        """[(distance_km, position)] of every point within radius_km, closest first."""
+        if not self.positions:
+            return []
+        q = _unit_vector(lat, lon)
+        qx, qy, qz = q
+        xs, ys, zs = self.xyz
+        limit = _km_to_chord2(radius_km)
+        found = []
+        stack = [0]
+        while stack:
+            node = stack.pop()
+            if self._box_dist2(node, q) > limit:
+                continue
+            if self._left[node] != -1:
+                stack.extend((self._left[node], self._right[node]))
+                continue
+            for i in range(self._lo[node], self._hi[node]):
+                p2 = (xs[i] - qx) ** 2 + (ys[i] - qy) ** 2 + (zs[i] - qz) ** 2
+                if p2 <= limit:
+                    found.append((p2, self.positions[i]))
+        found.sort()
+        return [(_chord2_to_km(d2), pos) for d2, pos in found]
+
+
+# ---------------------------
+# Postal code centroids
+# ---------------------------
+# Approximate: a PIN/ZIP resolves to the centre of its postal region, which is
+# enough to rank nearby providers when the user's town is not in the DB.
+
+# India: first two PIN digits -> (lat, lon) of the postal circle's main city
+INDIA_PIN_PREFIXES = {
+    "11": (28.61, 77.21), "12": (28.90, 76.61), "13": (30.38, 76.78), "14": (31.63, 74.87),
+    "15": (30.90, 75.85), "16": (30.73, 76.78), "17": (31.10, 77.17), "18": (32.73, 74.86),
+    "19": (34.08, 74.80), "20": (27.18, 78.01), "21": (25.44, 81.85), "22": (26.85, 80.95),
+    "23": (25.32, 82.97), "24": (30.32, 78.03), "25": (28.67, 77.45), "26": (29.22, 79.51),
+    "27": (26.76, 83.37), "28": (27.88, 78.08), "30": (26.91, 75.79), "31": (25.18, 75.83),
+    "32": (24.59, 73.71), "33": (28.02, 73.31), "34": (26.24, 73.02), "36": (22.30, 70.80),
+    "37": (23.24, 69.67), "38": (23.02, 72.57), "39": (21.17, 72.83), "40": (19.08, 72.88),
+    "41": (18.52, 73.86), "42": (20.00, 73.79), "43": (19.88, 75.34), "44": (21.15, 79.09),
+    "45": (22.72, 75.86), "46": (23.26, 77.41), "47": (26.22, 78.18), "48": (23.18, 79.99),
+    "49": (21.25, 81.63), "50": (17.39, 78.49), "51": (14.47, 78.82), "52": (16.51, 80.52),
+    "53": (17.69, 83.22), "56": (12.97, 77.59), "57": (12.91, 74.86), "58": (15.36, 75.12),
+    "59": (15.85, 74.50), "60": (13.08, 80.27), "61": (10.79, 78.70), "62": (9.93, 78.12),
+    "63": (11.66, 78.15), "64": (11.02, 76.96), "67": (11.26, 75.78), "68": (9.93, 76.27),
+    "69": (8.52, 76.94), "70": (22.57, 88.36), "71": (22.59, 88.26), "72": (22.42, 87.32),
+    "73": (26.73, 88.40), "74": (23.24, 87.86), "75": (20.46, 85.88), "76": (19.31, 84.79),
+    "77": (21.47, 83.97), "78": (26.14, 91.74), "79": (25.58, 91.89), "80": (25.59, 85.14),
+    "81": (25.24, 86.97), "82": (24.79, 85.00), "83": (23.34, 85.31), "84": (26.12, 85.39),
+    "85": (25.88, 86.60),
+}
+
+# USA: first three ZIP digits -> state; state -> (lat, lon) of its capital
+US_ZIP3_STATES = [
+    (10, "Massachusetts"), (28, "Rhode Island"), (30, "New Hampshire"), (39, "Maine"), (50, "Vermont"),
+    (55, "Massachusetts"), (56, "Vermont"), (60, "Connecticut"), (70, "New Jersey"), (90, None),
+    (100, "New York"), (150, "Pennsylvania"), (197, "Delaware"), (200, "Maryland"), (220, "Virginia"),
+    (247, "West Virginia"), (270, "North Carolina"), (290, "South Carolina"), (300, "Georgia"),
+    (320, "Florida"), (350, "Alabama"), (370, "Tennessee"), (386, "Mississippi"), (398, "Georgia"),
+    (400, "Kentucky"), (430, "Ohio"), (460, "Indiana"), (480, "Michigan"), (500, "Iowa"),
+    (530, "Wisconsin"), (550, "Minnesota"), (570, "South Dakota"), (580, "North Dakota"),
+    (590, "Montana"), (600, "Illinois"), (630, "Missouri"), (660, "Kansas"), (680, "Nebraska"),
+    (700, "Louisiana"), (716, "Arkansas"), (730, "Oklahoma"), (750, "Texas"), (800, "Colorado"),
+    (820, "Wyoming"), (832, "Idaho"), (840, "Utah"), (850, "Arizona"), (870, "New Mexico"),
+    (885, "Texas"), (889, "Nevada"), (900, "California"), (962, None), (967, "Hawaii"), (969, None),
+    (970, "Oregon"), (980, "Washington"), (995, "Alaska"),
+]
+_US_ZIP3_STARTS = [start for start, _ in US_ZIP3_STATES]
+
+US_STATE_CAPITALS = {
+    "Alabama": (32.38, -86.30), "Alaska": (58.30, -134.42), "Arizona": (33.45, -112.07),
+    "Arkansas": (34.75, -92.29), "California": (38.58, -121.49), "Colorado": (39.74, -104.99),
+    "Connecticut": (41.76, -72.68), "Delaware": (39.16, -75.52), "Florida": (30.44, -84.28),
+    "Georgia": (33.75, -84.39), "Hawaii": (21.31, -157.86), "Idaho": (43.62, -116.20),
+    "Illinois": (39.80, -89.65), "Indiana": (39.77, -86.16), "Iowa": (41.59, -93.62),
+    "Kansas": (39.05, -95.68), "Kentucky": (38.20, -84.87), "Louisiana": (30.45, -91.19),
+    "Maine": (44.31, -69.78), "Maryland": (38.98, -76.49), "Massachusetts": (42.36, -71.06),
+    "Michigan": (42.73, -84.56), "Minnesota": (44.95, -93.09), "Mississippi": (32.30, -90.18),
+    "Missouri": (38.58, -92.17), "Montana": (46.59, -112.04), "Nebraska": (40.81, -96.70),
+    "Nevada": (39.16, -119.77), "New Hampshire": (43.21, -71.54), "New Jersey": (40.22, -74.76),
+    "New Mexico": (35.69, -105.94), "New York": (42.65, -73.76), "North Carolina": (35.78, -78.64),
+    "North Dakota": (46.81, -100.78), "Ohio": (39.96, -83.00), "Oklahoma": (35.47, -97.52),
+    "Oregon": (44.94, -123.03), "Pennsylvania": (40.27, -76.88), "Rhode Island": (41.82, -71.41),
+    "South Carolina": (34.00, -81.03), "South Dakota": (44.37, -100.35), "Tennessee": (36.16, -86.78),
+    "Texas": (30.27, -97.74), "Utah": (40.76, -111.89), "Vermont": (44.26, -72.58),
+    "Virginia": (37.54, -77.44), "Washington": (47.04, -122.90), "West Virginia": (38.35, -81.63),
+    "Wisconsin": (43.07, -89.40), "Wyoming": (41.14, -104.82),
+}
+
+
+def resolve_postal_code(code: str, country: str = None):
+    """
+    (lat, lon) for an Indian PIN (6 digits) or US ZIP (5 digits, ZIP+4 allowed), or None.
+    country ('India'/'USA') disambiguates; otherwise the digit count decides.
+    """
+    digits = "".join(ch for ch in str(code) if ch.isdigit())
+    usa = (country or "").lower() in ["usa", "us", "united states", "america"]
+    if not usa and len(digits) == 6 and digits[0] != "0":
+        return INDIA_PIN_PREFIXES.get(digits[:2])
+    if len(digits) in (5, 9):
+        zip3 = int(digits[:3])
+        i = bisect_right(_US_ZIP3_STARTS, zip3) - 1
+        state = US_ZIP3_STATES[i][1] if i >= 0 else None
+        return US_STATE_CAPITALS.get(state)
+    return None
@@ -0,0 +1,106 @@
+# load_test.py
+# Local load generator for api_server.py: keeps N keep-alive connections busy with a
+# mix of search / nearest / vCard / triage requests and reports throughput and latency.
+#
+# Run:  python api_server.py --port 8080 &
+#       python load_test.py --url http://127.0.0.1:8080 --concurrency 32 --duration 10 [--json out.json]
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from urllib.parse import quote, urlsplit
+
+SEARCH_QUERIES = ["delhi", "mumbai", "california", "new york", "psychiatrist in delhi", "hyderabad",
+                  "bengaluru", "texas", "kolkata", "chennai", "pradesh", "nowhere-town"]
+FUZZY_QUERIES = ["hydrabad", "bangalore", "califrnia", "psychiatrist in mumbia"]
+MESSAGES = ["I feel fine today", "so much stress at work", "I want to end my life",
+            "mujhe bahut tanav hai", "can't sleep and feel anxious", "quiero morir"]
+POSTAL_CODES = ["110001", "560001", "400001", "94110", "10001", "60601"]
+
+
+def request_mix(rng):
+    """(method, path, body) drawn from a traffic mix weighted towards plain search."""
+    roll = rng.random()
+    if roll < 0.55:
+        return "GET", f"/search?q={quote(rng.choice(SEARCH_QUERIES))}&country={rng.choice(['India', 'USA'])}", b""
+    if roll < 0.65:
+        return "GET", f"/search?fuzzy=1&q={quote(rng.choice(FUZZY_QUERIES))}", b""
+    if roll < 0.75:
+        return "GET", f"/nearest?postal={rng.choice(POSTAL_CODES)}", b""
+    if roll < 0.80:
+        return "GET", f"/vcard?id={rng.randrange(0, 80)}", b""
+    return "POST", "/triage", json.dumps({"text": rng.choice(MESSAGES)}).encode("utf-8")
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    k = min(len(sorted_values) - 1, max(0, round(pct / 100.0 * (len(sorted_values) - 1))))
+    return sorted_values[k]
+
+
+async def worker(host, port, deadline, rng, latencies, errors):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while time.perf_counter() < deadline:
+            method, path, body = request_mix(rng)
+            request = (f"{method} {path} HTTP/1.1\r\nHost: {host}\r\nContent-Length: {len(body)}\r\n"
+                       f"Content-Type: application/json\r\n\r\n").encode("latin-1") + body
+            start = time.perf_counter()
+            writer.write(request)
+            await writer.drain()
+            head = await reader.readuntil(b"\r\n\r\n")
+            status = int(head.split(b" ", 2)[1])
+            length = 0
+            for line in head.split(b"\r\n"):
+                if line.lower().startswith(b"content-length:"):
+                    length = int(line.split(b":", 1)[1])
+            await reader.readexactly(length)
+            latencies.append(time.perf_counter() - start)
+            if status >= 400 and status != 404:
+                errors[status] = errors.get(status, 0) + 1
+    finally:
+        writer.close()
+
+
+async def run(url, concurrency, duration, seed):
+    parts = urlsplit(url)
+    host, port = parts.hostname or "127.0.0.1", parts.port or 80
+    latencies, errors = [], {}
+    deadline = time.perf_counter() + duration
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(host, port, deadline, random.Random(seed + i), latencies, errors)
+                           for i in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    ms = [v * 1000.0 for v in latencies]
+    return {
+        "url": url,
+        "concurrency": concurrency,
+        "duration_s": round(elapsed, 3),
+        "requests": len(ms),
+        "throughput_rps": round(len(ms) / elapsed, 1) if elapsed else 0.0,
+        "latency_ms": {"p50": round(percentile(ms, 50), 3), "p90": round(percentile(ms, 90), 3),
+                       "p99": round(percentile(ms, 99), 3), "max": round(ms[-1], 3) if ms else 0.0},
+        "errors": errors,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load-test the MindCare JSON API.")
+    parser.add_argument("--url", default="http://127.0.0.1:8080")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", help="also write the report to this file")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args.url, args.concurrency, args.duration, args.seed))
+    json.dump(report, sys.stdout, indent=2)
+    print()
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
@@ -0,0 +1,195 @@
+# metrics.py
+# In-process counters and latency histograms for the Streamlit app and api_server.py,
+# exported as Prometheus text or JSON (api_server's /metrics route, or a file).
+#
+# Collection is off unless MINDCARE_METRICS=1 (or enable() is called). While off,
+# timer() hands back a shared no-op and timed() wrappers call straight through,
+# so instrumented code pays one flag check.
+#
+#   MINDCARE_METRICS=1 MINDCARE_METRICS_FILE=metrics.prom streamlit run app.py
+#   python api_server.py --metrics   then   curl localhost:8080/metrics[?format=json]
+
+import functools
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+
+# Upper bounds in seconds; an implicit +Inf bucket follows
+BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+           0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+METRICS_FILE = os.environ.get("MINDCARE_METRICS_FILE")
+FLUSH_INTERVAL = 10.0                  # seconds between writes to METRICS_FILE
+
+_enabled = os.environ.get("MINDCARE_METRICS", "").lower() in ("1", "true", "yes", "on")
+_lock = threading.Lock()
+_counters = {}                         # (name, labels) -> value
+_histograms = {}                       # (name, labels) -> [bucket counts..., +Inf count], sum
+_last_flush = 0.0
+
+
+def enabled() -> bool:
+    return _enabled
+
+def enable(on: bool = True):
+    global _enabled
+    _enabled = on
+
+def reset():
+    with _lock:
+        _counters.clear()
+        _histograms.clear()
+
+
+def _key(name, labels):
+    return name, tuple(sorted(labels.items())) if labels else ()
+
+def inc(name: str, value: float = 1, **labels):
+    """Add value to counter name{labels}."""
+    if not _enabled:
+        return
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+def observe(name: str, seconds: float, **labels):
+    """Record one duration in histogram name{labels}."""
+    if not _enabled:
+        return
+    key = _key(name, labels)
+    i = bisect_left(BUCKETS, seconds)
+    with _lock:
+        hist = _histograms.get(key)
+        if hist is None:
+            hist = _histograms[key] = [[0] * (len(BUCKETS) + 1), 0.0]
+        hist[0][i] += 1
+        hist[1] += seconds
+
+
+class _Timer:
+    __slots__ = ("name", "labels", "_start")
+
+    def __init__(self, name, labels):
+        self.name = name
+        self.labels = labels
+        self._start = None
+
+    def start(self):
+        self._start = time.perf_counter()
+        return self
+
+    def stop(self, **labels):
+        """Record the elapsed time; labels known only at the end (e.g. cache="hit") are added."""
+        if self._start is not None:
+            observe(self.name, time.perf_counter() - self._start, **self.labels, **labels)
+            self._start = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def start(self):
+        return self
+
+    def stop(self, **labels):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+
+_NULL_TIMER = _NullTimer()
+
+def timer(name: str, **labels):
+    """Context manager (or start()/stop() pair) timing a block into histogram name{labels}."""
+    return _Timer(name, labels) if _enabled else _NULL_TIMER
+
+def timed(name: str, **labels):
+    """Decorator form of timer()."""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                observe(name, time.perf_counter() - start, **labels)
+        return wrapper
+    return decorate
+
+
+# ---------------------------
+# Export
+# ---------------------------
+def snapshot() -> dict:
+    """JSON-able copy of every counter and histogram (bucket counts are cumulative)."""
+    with _lock:
+        counters = list(_counters.items())
+        histograms = [(key, list(counts), total) for key, (counts, total) in _histograms.items()]
+    out = {"enabled": _enabled, "counters": {}, "histograms": {}}
+    for (name, labels), value in sorted(counters):
+        out["counters"].setdefault(name, []).append({"labels": dict(labels), "value": value})
+    for (name, labels), counts, total in sorted(histograms, key=lambda h: h[0]):
+        cumulative, running = {}, 0
+        for bound, n in zip(BUCKETS + ("+Inf",), counts):
+            running += n
+            cumulative[str(bound)] = running
+        out["histograms"].setdefault(name, []).append(
+            {"labels": dict(labels), "count": running, "sum": total, "buckets": cumulative})
+    return out
+
+def _label_text(labels, extra=None):
+    pairs = list(labels.items()) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+def render_prometheus() -> str:
+    """Prometheus text exposition format (version 0.0.4)."""
+    snap = snapshot()
+    lines = []
+    for name, series in snap["counters"].items():
+        lines.append(f"# TYPE {name} counter")
+        lines.extend(f"{name}{_label_text(s['labels'])} {s['value']}" for s in series)
+    for name, series in snap["histograms"].items():
+        lines.append(f"# TYPE {name} histogram")
+        for s in series:
+            for bound, n in s["buckets"].items():
+                lines.append(f"{name}_bucket{_label_text(s['labels'], ('le', bound))} {n}")
+            lines.append(f"{name}_sum{_label_text(s['labels'])} {s['sum']:.6f}")
+            lines.append(f"{name}_count{_label_text(s['labels'])} {s['count']}")
+    return "\n".join(lines) + "\n"
+
+def write(path: str):
+    """Write all metrics to path: JSON for *.json, Prometheus text otherwise."""
+    text = json.dumps(snapshot(), indent=2) if path.endswith(".json") else render_prometheus()
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+def maybe_flush(path: str = None):
+    """write() to path (default MINDCARE_METRICS_FILE) at most once per FLUSH_INTERVAL."""
+    global _last_flush
+    path = path or METRICS_FILE
+    if not _enabled or not path:
+        return
+    now = time.monotonic()
+    if now - _last_flush < FLUSH_INTERVAL:
+        return
+    _last_flush = now
+    write(path)
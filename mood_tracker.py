@@ -0,0 +1,188 @@
+# mood_tracker.py
+# Daily mood logging backed by a local SQLite file.
+# - mood_log is append-only: one row per check-in, never updated.
+# - mood_daily keeps one (user, day) row with the day's total and count, clustered by
+#   its primary key, so a year of chart data is one short range scan.
+# - mood_summary holds running aggregates (entries, total, streaks) updated in the
+#   same transaction as each insert, so dashboards never rescan a user's history.
+
+import os
+import sqlite3
+import threading
+import time
+from datetime import date
+
+DEFAULT_PATH = os.environ.get("MINDCARE_MOOD_DB", "mindcare_mood.db")
+MIN_SCORE, MAX_SCORE = 1, 10
+MIN_CODE_LENGTH = 22                   # secrets.token_urlsafe(16); shorter ids are guessable
+
+# Trend alerts: a week well below the month, or a week that is low on its own
+TREND_DROP = 1.5
+LOW_WEEK = 3.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS mood_log (
+    user_id TEXT NOT NULL,
+    ts      INTEGER NOT NULL,
+    day     INTEGER NOT NULL,
+    score   INTEGER NOT NULL,
+    note    TEXT NOT NULL DEFAULT ''
+);
+CREATE TABLE IF NOT EXISTS mood_daily (
+    user_id TEXT NOT NULL,
+    day     INTEGER NOT NULL,
+    total   INTEGER NOT NULL,
+    count   INTEGER NOT NULL,
+    PRIMARY KEY (user_id, day)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS mood_summary (
+    user_id     TEXT PRIMARY KEY,
+    entries     INTEGER NOT NULL,
+    total       INTEGER NOT NULL,
+    first_day   INTEGER NOT NULL,
+    last_day    INTEGER NOT NULL,
+    streak      INTEGER NOT NULL,
+    best_streak INTEGER NOT NULL
+) WITHOUT ROWID;
+"""
+
+
+class MoodTracker:
+    """Append-only mood log with incrementally maintained per-user aggregates."""
+
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._lock = threading.Lock()
+        if path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+    def close(self):
+        self._conn.close()
+
+    def log(self, user_id: str, score: int, note: str = "", when: date = None) -> dict:
+        """Record one check-in and return the updated summary."""
+        if not user_id:
+            raise ValueError("user_id is required")
+        score = int(score)
+        if not MIN_SCORE <= score <= MAX_SCORE:
+            raise ValueError(f"score must be between {MIN_SCORE} and {MAX_SCORE}")
+        day = (when or date.today()).toordinal()
+        with self._lock:
+            cur = self._conn.cursor()
+            cur.execute("BEGIN IMMEDIATE")
+            try:
+                cur.execute("INSERT INTO mood_log (user_id, ts, day, score, note) VALUES (?, ?, ?, ?, ?)",
+                            (user_id, int(time.time()), day, score, note or ""))
+                cur.execute("INSERT INTO mood_daily (user_id, day, total, count) VALUES (?, ?, ?, 1) "
+                            "ON CONFLICT (user_id, day) DO UPDATE SET total = total + excluded.total, count = count + 1",
+                            (user_id, day, score))
+                self._update_summary(cur, user_id, day, score)
+                cur.execute("COMMIT")
+            except BaseException:
+                cur.execute("ROLLBACK")
+                raise
+        return self.summary(user_id)
+
+    def _update_summary(self, cur, user_id, day, score):
+        row = cur.execute("SELECT entries, total, first_day, last_day, streak, best_streak "
+                          "FROM mood_summary WHERE user_id = ?", (user_id,)).fetchone()
+        if row is None:
+            cur.execute("INSERT INTO mood_summary VALUES (?, 1, ?, ?, ?, 1, 1)", (user_id, score, day, day))
+            return
+        entries, total, first_day, last_day, streak, best = row
+        new_day = cur.execute("SELECT count FROM mood_daily WHERE user_id = ? AND day = ?",
+                              (user_id, day)).fetchone()[0] == 1
+        if not new_day:
+            pass                           # second check-in on a day: runs are unchanged
+        elif day == last_day + 1:
+            streak += 1
+        elif day > last_day + 1:
+            streak = 1
+        else:
+            # back-filled a missed day: it can only join runs touching it
+            after = self._run_length(cur, user_id, day + 1, 1)
+            run = self._run_length(cur, user_id, day, -1) + after
+            if day + after >= last_day:
+                streak = run
+            best = max(best, run)
+        best = max(best, streak)
+        cur.execute("UPDATE mood_summary SET entries = ?, total = ?, first_day = ?, last_day = ?, streak = ?, "
+                    "best_streak = ? WHERE user_id = ?",
+                    (entries + 1, total + score, min(first_day, day), max(last_day, day), streak, best, user_id))
+
+    def _run_length(self, cur, user_id, start, step):
+        # consecutive logged days from start walking in direction step; only used for back-fills
+        if step < 0:
+            sql = "SELECT day FROM mood_daily WHERE user_id = ? AND day <= ? ORDER BY day DESC"
+        else:
+            sql = "SELECT day FROM mood_daily WHERE user_id = ? AND day >= ? ORDER BY day"
+        length, expected = 0, start
+        for (d,) in cur.execute(sql, (user_id, start)):   # rows stream; stop at the first gap
+            if d != expected:
+                break
+            length += 1
+            expected += step
+        return length
+
+    def _window(self, user_id, today, days):
+        total, count = self._conn.execute(
+            "SELECT COALESCE(SUM(total), 0), COALESCE(SUM(count), 0) FROM mood_daily "
+            "WHERE user_id = ? AND day > ? AND day <= ?", (user_id, today - days, today)).fetchone()
+        return total / count if count else None
+
+    def summary(self, user_id: str, today: date = None) -> dict:
+        """
+        Running aggregates plus rolling 7/30-day averages and trend alerts.
+        Costs one primary-key lookup and two range scans of at most 30 daily rows.
+        """
+        today_n = (today or date.today()).toordinal()
+        with self._lock:
+            row = self._conn.execute("SELECT entries, total, first_day, last_day, streak, best_streak "
+                                     "FROM mood_summary WHERE user_id = ?", (user_id,)).fetchone()
+            if row is None:
+                return {"entries": 0, "average": None, "avg_7": None, "avg_30": None, "streak": 0,
+                        "best_streak": 0, "first_day": None, "last_day": None, "alerts": []}
+            entries, total, first_day, last_day, streak, best = row
+            avg_7, avg_30 = self._window(user_id, today_n, 7), self._window(user_id, today_n, 30)
+        alerts = []
+        if avg_7 is not None and avg_30 is not None and avg_30 - avg_7 >= TREND_DROP:
+            alerts.append(f"Your mood this week ({avg_7:.1f}) is well below your 30-day average ({avg_30:.1f}).")
+        if avg_7 is not None and avg_7 <= LOW_WEEK:
+            alerts.append("Your mood has been low this week. Consider reaching out to someone you trust or a helpline.")
+        return {
+            "entries": entries,
+            "average": total / entries,
+            "avg_7": avg_7,
+            "avg_30": avg_30,
+            # a streak is only current if the last check-in was today or yesterday
+            "streak": streak if today_n - last_day <= 1 else 0,
+            "best_streak": best,
+            "first_day": date.fromordinal(first_day),
+            "last_day": date.fromordinal(last_day),
+            "alerts": alerts,
+        }
+
+    def daily_series(self, user_id: str, start: date, end: date = None):
+        """[(date, average score)] for logged days in [start, end], oldest first."""
+        end_n = (end or date.today()).toordinal()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT day, CAST(total AS REAL) / count FROM mood_daily "
+                "WHERE user_id = ? AND day >= ? AND day <= ? ORDER BY day", (user_id, start.toordinal(), end_n)).fetchall()
+        return [(date.fromordinal(d), avg) for d, avg in rows]
+
+
+_default = None
+_default_lock = threading.Lock()
+
+def default_tracker() -> MoodTracker:
+    """Process-wide tracker on DEFAULT_PATH, opened on first use."""
+    global _default
+    if _default is None:
+        with _default_lock:
+            if _default is None:
+                _default = MoodTracker()
+    return _default
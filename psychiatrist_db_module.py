@@ -1,7 +1,15 @@
 # psychiatrist_db_module.py
-import streamlit as st
+import threading
 import urllib.parse
 
+import streamlit as st
+
+import metrics
+from asset_cache import ASSETS
+from geo_index import US_STATE_CAPITALS, coordinates, resolve_postal_code
+from resource_index import QueryCache, ResourceIndex, freeze_results, normalize
+from resource_table import ENTRY_FIELDS, TableRows
+
 # ---------------------------
 # Expanded Psychiatry / Mental-Health Resource DB
 # ---------------------------
@@ -10,6 +18,8 @@ import urllib.parse
 # or connect to a live API (Google Places / Healthgrades / Practo / local health dept).
 #
 # Each entry: { "name", "type": ("hospital"/"clinic"/"helpline"/"private"), "phone", "address", "city", "state", "telehealth_url", "notes" }
+ENTRY_TYPES = ("hospital", "clinic", "helpline", "private")
+# Optional: "lat", "lon" (decimal degrees) for nearest-help search; filled from CITY_COORDINATES when absent.
 
 INDIA_STATE_RESOURCES = {
     "Andhra Pradesh": [
@@ -124,67 +134,226 @@ US_STATES = ["Alabama","Alaska","Arizona","Arkansas","California","Colorado","Co
              "Ohio","Oklahoma","Oregon","Pennsylvania","Rhode Island","South Carolina","South Dakota","Tennessee",
              "Texas","Utah","Vermont","Virginia","Washington","West Virginia","Wisconsin","Wyoming"]
 
-for s in US_STATES:
-    USA_STATE_RESOURCES[s] = [
-        {"name": f"{s} State Mental Health Hotline (placeholder)", "type":"helpline", "phone":"988", "address":s, "city":s, "state":s, "telehealth_url":"https://www.samhsa.gov/find-help/national-helpline", "notes":"Replace with state/local resources"}
-    ]
+def _us_state_placeholders():
+    return {
+        s: [
+            {"name": f"{s} State Mental Health Hotline (placeholder)", "type":"helpline", "phone":"988", "address":s, "city":s, "state":s, "telehealth_url":"https://www.samhsa.gov/find-help/national-helpline", "notes":"Replace with state/local resources",
+             "lat": US_STATE_CAPITALS[s][0], "lon": US_STATE_CAPITALS[s][1]}
+        ]
+        for s in US_STATES
+    }
+
+# Built once per process; Streamlit module reloads reuse it unless this file changed
+USA_STATE_RESOURCES.update(ASSETS.get("us_state_placeholders", _us_state_placeholders, sources=(__file__,)))
+
+# Approximate city coordinates for the entries above (lat, lon)
+CITY_COORDINATES = {
+    "Amaravati": (16.51, 80.52), "Itanagar": (27.08, 93.61), "Guwahati": (26.14, 91.74), "Patna": (25.59, 85.14),
+    "Raipur": (21.25, 81.63), "Panaji": (15.49, 73.83), "Gandhinagar": (23.22, 72.65), "Rohtak": (28.90, 76.61),
+    "Shimla": (31.10, 77.17), "Ranchi": (23.34, 85.31), "Bengaluru": (12.97, 77.59), "Thiruvananthapuram": (8.52, 76.94),
+    "Bhopal": (23.26, 77.41), "Mumbai": (19.08, 72.88), "Imphal": (24.82, 93.94), "Shillong": (25.58, 91.89),
+    "Aizawl": (23.73, 92.72), "Kohima": (25.67, 94.11), "Cuttack": (20.46, 85.88), "Chandigarh": (30.73, 76.78),
+    "Jaipur": (26.91, 75.79), "Gangtok": (27.33, 88.61), "Chennai": (13.08, 80.27), "Hyderabad": (17.39, 78.49),
+    "Agartala": (23.83, 91.29), "Lucknow": (26.85, 80.95), "Dehradun": (30.32, 78.03), "Kolkata": (22.57, 88.36),
+    "Port Blair": (11.62, 92.73), "Dadra": (20.33, 73.02), "Daman": (20.40, 72.83), "New Delhi": (28.61, 77.21),
+    "Kavaratti": (10.57, 72.64), "Puducherry": (11.94, 79.81),
+}
+
+def _attach_coordinates(resources):
+    for items in resources.values():
+        for e in items:
+            if coordinates(e) is None and e.get("city") in CITY_COORDINATES:
+                e["lat"], e["lon"] = CITY_COORDINATES[e["city"]]
+
+_attach_coordinates(INDIA_STATE_RESOURCES)
+
+# Synthetic last-resort entry returned when nothing matches an Indian query
+INDIA_NATIONAL_FALLBACK = {"name":"National Mental Health Helpline (India) - Vandrevala or similar", "type":"helpline", "phone":"1860-266-2345", "address":"Nationwide", "city":"Nationwide", "state":"India", "telehealth_url":"", "notes":"Replace with the country's official helpline as appropriate"}
+
+# Bump whenever the resource dicts above are modified so the search index is rebuilt
+DB_VERSION = 1
+
+_index = None
+_index_lock = threading.Lock()
+
+# Results for the most frequent queries ("delhi", "mumbai", "california", ...)
+QUERY_CACHE = QueryCache(maxsize=1024)
 
 # ---------------------------
 # Helper functions
 # ---------------------------
-def normalize(s: str) -> str:
-    return s.strip().lower() if isinstance(s, str) else ""
+def bump_db_version():
+    global DB_VERSION
+    with _index_lock:
+        DB_VERSION += 1
 
+def get_resource_index() -> ResourceIndex:
+    """Return the search index for the current DB version, building it on first use."""
+    global _index
+    index = _index
+    if index is None or index.version != DB_VERSION:
+        with _index_lock:
+            index = _index
+            if index is None or index.version != DB_VERSION:
+                index = ResourceIndex(INDIA_STATE_RESOURCES, USA_STATE_RESOURCES,
+                                      extra=[INDIA_NATIONAL_FALLBACK], version=DB_VERSION)
+                _index = index
+    return index
+
+def install_catalog(india_states: dict, usa_states: dict, warm: bool = True) -> ResourceIndex:
+    """
+    Build the indexes for a new catalog, then swap catalog and index in atomically.
+    Searches already running keep the index they started with; later ones see the new version.
+    warm=True also builds the fuzzy, geo and facet indexes before the swap.
+    Afterwards the module-level dicts hold row views into the index's compact table,
+    so the source mappings passed in can be garbage-collected.
+    """
+    global INDIA_STATE_RESOURCES, USA_STATE_RESOURCES, DB_VERSION, _index
+    index = ResourceIndex(india_states, usa_states, extra=[INDIA_NATIONAL_FALLBACK])
+    if warm:
+        index.fuzzy, index.geo, index.facets
+    with _index_lock:
+        index.version = DB_VERSION + 1
+        INDIA_STATE_RESOURCES, USA_STATE_RESOURCES = index.india.states(), index.usa.states()
+        _index = index
+        DB_VERSION = index.version
+    return index
+
+def _search_positions(q: str, country_hint: str, index: ResourceIndex):
+    """Positions matching normalized query q, and whether they came from the national fallback."""
+    # check India DB
+    positions = index.match_india(q)
+
+    # check USA DB if not found and country_hint is USA
+    if not positions and (country_hint.lower() in ["usa","us","united states","america"] or "usa" in q or "us" in q):
+        positions = index.match_usa(q)
+
+    if positions:
+        return positions, False
+
+    # If still none, fallback to national helplines
+    # If query contains a US city/state keyword heuristics: return USA national
+    if any(tok in q for tok in ["usa","us","united states","new york","san francisco","los angeles","chicago"]):
+        return index.usa.rows("national"), True
+    # default India national helpline + Delhi AIIMS if query empty
+    return list(index.india.rows("Delhi")) + list(index.extra_rows), True
+
+@metrics.timed("mindcare_search_seconds", kind="location", cache="bypass")
 def search_resources_by_location(query: str, country_hint: str = "India"):
     """
     Query can be city or state or 'psychiatrist in <city>'.
     country_hint: 'India' or 'USA' - used to search the appropriate DB first.
     Returns list of matches.
     """
+    index = get_resource_index()
+    positions, _ = _search_positions(normalize(query), country_hint, index)
+    return index.get(positions)
+
+def _cached_search(query: str, country_hint: str = "India", index: ResourceIndex = None):
+    """(results, fell_back, positions) from QUERY_CACHE, keyed on (normalize(query), country_hint)."""
+    timer = metrics.timer("mindcare_search_seconds", kind="location").start()
     q = normalize(query)
-    matches = []
+    key = (q, country_hint)
+    index = index or get_resource_index()
+    cached = QUERY_CACHE.get(key, index.version)
+    result = "hit"
+    if cached is None:
+        result = "miss"
+        positions, fell_back = _search_positions(q, country_hint, index)
+        cached = (freeze_results(index.get(positions)), fell_back, tuple(positions))
+        QUERY_CACHE.put(key, cached, index.version)
+    # every lookup is timed; the cache label separates hits from misses
+    timer.stop(cache=result)
+    metrics.inc("mindcare_query_cache_total", result=result)
+    return cached
 
-    # check India DB
-    for state, items in INDIA_STATE_RESOURCES.items():
-        if q == normalize(state) or q in normalize(state) or normalize(state) in q:
-            matches.extend(items)
-        else:
-            # also check cities inside each entry
-            for e in items:
-                if q == normalize(e.get("city", "")) or q in normalize(e.get("city", "")):
-                    matches.append(e)
+def search_resources_cached(query: str, country_hint: str = "India"):
+    """Same matches as search_resources_by_location, memoized; returns a tuple of read-only entries."""
+    return _cached_search(query, country_hint)[0]
 
-    # check USA DB if not found and country_hint is USA
-    if not matches and (country_hint.lower() in ["usa","us","united states","america"] or "usa" in q or "us" in q):
-        for state, items in USA_STATE_RESOURCES.items():
-            if normalize(state) in q or q == normalize(state):
-                matches.extend(items)
-            else:
-                for e in items:
-                    if q == normalize(e.get("city","")) or q in normalize(e.get("city","")):
-                        matches.append(e)
+def search_fell_back(query: str, country_hint: str = "India") -> bool:
+    """True when the location search found nothing and returned the national-helpline fallback."""
+    return _cached_search(query, country_hint)[1]
 
-    # If still none, fallback to national helplines
-    if not matches:
-        # If query contains a US city/state keyword heuristics: return USA national
-        if any(tok in q for tok in ["usa","us","united states","new york","san francisco","los angeles","chicago"]):
-            matches.extend(USA_STATE_RESOURCES["national"])
-        else:
-            # default India national helpline + Delhi AIIMS if query empty
-            matches.extend(INDIA_STATE_RESOURCES.get("Delhi", []))
-            matches.append({"name":"National Mental Health Helpline (India) - Vandrevala or similar", "type":"helpline", "phone":"1860-266-2345", "address":"Nationwide", "city":"Nationwide", "state":"India", "telehealth_url":"", "notes":"Replace with the country's official helpline as appropriate"})
+def query_cache_stats() -> dict:
+    return QUERY_CACHE.stats()
+
+def search_resources_faceted(query: str, country_hint: str = "India", filters: dict = None):
+    """
+    Location search narrowed by facet filters, e.g. {"type": ["hospital"], "telehealth": True,
+    "country": "India", "state": ["Delhi"]}.
+    Returns (results, counts, fell_back): counts are {facet: {value: n}} over the unfiltered
+    matches, so the UI can show how many results each filter would keep; fell_back is as for
+    search_fell_back. One query-cache lookup per call.
+    """
+    index = get_resource_index()
+    results, fell_back, positions = _cached_search(query, country_hint, index)
+    facets = index.facets
+    counts = facets.counts(positions)
+    if not filters:
+        return results, counts, fell_back
+    return TableRows(index.table, facets.filter(positions, filters)), counts, fell_back
+
+def catalog_facet_counts() -> dict:
+    """{facet: {value: n}} over the whole catalog, precomputed per DB version."""
+    return get_resource_index().facets.catalog_counts
+
+def _country_rows(index: ResourceIndex, country_hint: str):
+    usa = country_hint.lower() in ["usa","us","united states","america"]
+    region = index.usa if usa else index.india
+    return range(region.state_rows[0].start, region.state_rows[-1].stop) if region.state_rows else range(0)
+
+@metrics.timed("mindcare_search_seconds", kind="fuzzy")
+def search_resources_fuzzy(query: str, country_hint: str = "India", top_k: int = 10, filters: dict = None):
+    """
+    Typo-tolerant search ('hydrabad', 'psychiatrist in mumbia') over name, city and state.
+    Returns up to top_k matches ranked by trigram similarity; ties favour country_hint.
+    filters: same facet filters as search_resources_faceted.
+    """
+    index = get_resource_index()
+    allowed = index.facets.predicate(filters) if filters else None
+    ranked = index.fuzzy.search(query, top_k=top_k, prefer=_country_rows(index, country_hint), allowed=allowed)
+    return index.get(pos for _, pos in ranked)
+
+def suggest_locations(query: str, limit: int = 3):
+    """City/state names close to query, for 'did you mean' prompts."""
+    return get_resource_index().fuzzy.suggest(query, limit=limit)
 
-    return matches
+@metrics.timed("mindcare_search_seconds", kind="nearest")
+def nearest_resources(lat: float, lon: float, k: int = 10, radius_km: float = None):
+    """
+    Up to k resources closest to (lat, lon), optionally within radius_km.
+    Returns list of (distance_km, entry), closest first; entries without coordinates are skipped.
+    """
+    index = get_resource_index()
+    return [(km, index.entries[pos]) for km, pos in index.geo.nearest(lat, lon, k=k, radius_km=radius_km)]
+
+def resources_within(lat: float, lon: float, radius_km: float):
+    """Every resource within radius_km of (lat, lon) as (distance_km, entry), closest first."""
+    index = get_resource_index()
+    return [(km, index.entries[pos]) for km, pos in index.geo.within(lat, lon, radius_km)]
+
+def nearest_resources_to_postal_code(code: str, country: str = None, k: int = 10):
+    """nearest_resources() around the centre of an Indian PIN or US ZIP; [] if the code is unknown."""
+    latlon = resolve_postal_code(code, country)
+    return nearest_resources(latlon[0], latlon[1], k=k) if latlon else []
 
 def google_maps_link(address: str, name: str = "") -> str:
     q = f"{name} {address}".strip()
     return "https://www.google.com/maps/search/?api=1&query=" + urllib.parse.quote(q)
 
+def vcard_escape(value) -> str:
+    """Escape a vCard 3.0 text value (RFC 2426): backslash, comma, semicolon and newlines."""
+    s = "" if value is None else str(value)
+    s = s.replace("\\", "\\\\").replace(",", "\\,").replace(";", "\\;")
+    return s.replace("\r\n", "\\n").replace("\n", "\\n").replace("\r", "\\n")
+
+@metrics.timed("mindcare_vcard_seconds")
 def make_vcard(entry):
     """Return vCard string for download (basic)."""
-    name = entry.get("name", "Contact")
-    phone = entry.get("phone", "")
-    org = entry.get("address", "")
+    name = vcard_escape(entry.get("name", "Contact"))
+    phone = vcard_escape(entry.get("phone", ""))
+    org = vcard_escape(entry.get("address", ""))
     vcard = [
         "BEGIN:VCARD",
         "VERSION:3.0",
@@ -199,6 +368,26 @@ def make_vcard(entry):
 # ---------------------------
 # Streamlit UI snippet to integrate
 # ---------------------------
+RESULTS_PAGE_SIZE = 10
+FUZZY_TOP_K = 50
+
+def _set_resource_page(page: int):
+    st.session_state["resource_page"] = max(0, page)
+
+def _show_resource(r, key: str):
+    st.markdown("**" + r.get("name", "Unknown") + "**")
+    st.write(f"- Type: {r.get('type','')}")
+    st.write(f"- Phone: {r.get('phone','N/A')}")
+    st.write(f"- Address: {r.get('address','N/A')}, City: {r.get('city','N/A')}, State: {r.get('state','N/A')}")
+    if r.get("telehealth_url"):
+        st.markdown(f"- [Book Teleconsult]({r.get('telehealth_url')})")
+    # Google maps
+    maps_url = google_maps_link(r.get("address","") + " " + r.get("city",""))
+    st.markdown(f"- [View on Google Maps]({maps_url})")
+    # vCard download
+    st.download_button(label="Download contact (vCard)", data=make_vcard(r), file_name=f"{r.get('name','contact')}.vcf", mime="text/vcard", key=key)
+    st.markdown("---")
+
 def show_psychiatrist_search_ui():
     st.header("Find Mental Health Support — Search by city/state")
     col1, col2 = st.columns([3,1])
@@ -206,29 +395,101 @@ def show_psychiatrist_search_ui():
         query = st.text_input("Search (e.g., 'psychiatrist in delhi', 'hyderabad', 'california')", value="")
     with col2:
         country = st.selectbox("Country", ["India", "USA"], index=0)
+    fuzzy = st.checkbox("Typo-tolerant search", value=False)
+    fcol1, fcol2, fcol3 = st.columns([2,1,1])
+    with fcol1:
+        types = st.multiselect("Type", list(ENTRY_TYPES), default=[])
+    with fcol2:
+        telehealth_only = st.checkbox("Teleconsult available", value=False)
+    with fcol3:
+        country_only = st.checkbox(f"Only in {country}", value=False)
 
     if st.button("Search"):
         if not query.strip():
             st.warning("Please enter a city or state (e.g., 'delhi', 'bengaluru', 'california').")
             return
-        results = search_resources_by_location(query, country_hint=country)
+        # kept in the session so paging and filter changes don't need another click
+        st.session_state["resource_search"] = (query, country, fuzzy)
+        st.session_state["resource_page"] = 0
+        st.session_state.pop("resource_states", None)     # state choices belong to the previous results
+
+    if st.session_state.get("resource_search"):
+        searched_query, searched_country, searched_fuzzy = st.session_state["resource_search"]
+        # the State widget is drawn below from this search's counts; its current value is in the session
+        states = st.session_state.get("resource_states") or []
+        filters = {"type": types or None, "telehealth": True if telehealth_only else None,
+                   "country": searched_country if country_only else None, "state": states or None}
+        if st.session_state.get("resource_filters") != filters:
+            st.session_state["resource_filters"] = filters
+            st.session_state["resource_page"] = 0
+        counts = None
+        if searched_fuzzy:
+            results = search_resources_fuzzy(searched_query, country_hint=searched_country, top_k=FUZZY_TOP_K, filters=filters)
+            fell_back = not results
+        else:
+            results, counts, fell_back = search_resources_faceted(searched_query, searched_country, filters)
+        # state choices: states in the (unfiltered) matches with their counts; whole catalog for fuzzy
+        state_counts = counts["state"] if counts else catalog_facet_counts()["state"]
+        st.multiselect("State", sorted(s for s, n in state_counts.items() if n),
+                       format_func=(lambda s: f"{s} ({counts['state'][s]})") if counts else str,
+                       key="resource_states")
+        if fell_back:
+            suggestions = suggest_locations(searched_query)
+            if suggestions:
+                st.info("Did you mean: " + ", ".join(f"**{s}**" for s in suggestions) + "?")
         st.success(f"Found {len(results)} resource(s) — verify details before contact.")
-        for r in results:
-            st.markdown("**" + r.get("name", "Unknown") + "**")
-            st.write(f"- Type: {r.get('type','')}")
-            st.write(f"- Phone: {r.get('phone','N/A')}")
-            st.write(f"- Address: {r.get('address','N/A')}, City: {r.get('city','N/A')}, State: {r.get('state','N/A')}")
-            if r.get("telehealth_url"):
-                st.markdown(f"- [Book Teleconsult]({r.get('telehealth_url')})")
-            # Google maps
-            maps_url = google_maps_link(r.get("address","") + " " + r.get("city",""))
-            st.markdown(f"- [View on Google Maps]({maps_url})")
-            # vCard download
-            vcard = make_vcard(r)
-            b64 = vcard.encode("utf-8").decode("latin1")
-            btn_key = f"vcard_{r.get('name','')}"
-            st.download_button(label="Download contact (vCard)", data=vcard, file_name=f"{r.get('name','contact')}.vcf", mime="text/vcard")
-            st.markdown("---")
+        if counts:
+            summary = [f"{t} ({n})" for t, n in sorted(counts["type"].items()) if n]
+            summary.append(f"teleconsult ({counts['telehealth'].get(True, 0)})")
+            summary.extend(f"{c} ({n})" for c, n in counts["country"].items() if n)
+            st.caption("In these results: " + " · ".join(summary))
+
+        # Only the current page is rendered (and only its vCards built)
+        pages = max(1, -(-len(results) // RESULTS_PAGE_SIZE))
+        page = min(st.session_state.get("resource_page", 0), pages - 1)
+        start = page * RESULTS_PAGE_SIZE
+        for offset, r in enumerate(results[start:start + RESULTS_PAGE_SIZE]):
+            _show_resource(r, key=f"vcard_{start + offset}")
+        if pages > 1:
+            prev_col, info_col, next_col = st.columns([1,2,1])
+            with prev_col:
+                st.button("◀ Previous", key="resource_prev", disabled=page == 0,
+                          on_click=_set_resource_page, args=(page - 1,))
+            with info_col:
+                st.caption(f"Page {page + 1} of {pages} · results {start + 1}–{min(start + RESULTS_PAGE_SIZE, len(results))}")
+            with next_col:
+                st.button("Next ▶", key="resource_next", disabled=page >= pages - 1,
+                          on_click=_set_resource_page, args=(page + 1,))
+
+        # Bulk export; payloads are generated only when a button is clicked
+        from resource_export import FORMATS, export_bytes, export_filename, region_entries
+        vcf_col, csv_col, region_col = st.columns(3)
+        with vcf_col:
+            st.download_button("Export results (.vcf)", data=lambda: export_bytes(results, "vcf"),
+                               file_name=export_filename(searched_query, "vcf"), mime=FORMATS["vcf"], key="export_vcf")
+        with csv_col:
+            st.download_button("Export results (.csv)", data=lambda: export_bytes(results, "csv"),
+                               file_name=export_filename(searched_query, "csv"), mime=FORMATS["csv"], key="export_csv")
+        with region_col:
+            st.download_button(f"Export all of {searched_country} (.zip)",
+                               data=lambda: export_bytes(region_entries(searched_country), "csv", zipped=True),
+                               file_name=export_filename(searched_country, "csv", zipped=True), mime="application/zip", key="export_region")
+
+    # Nearest help by postal code or coordinates
+    with st.expander("Find the nearest help (PIN / ZIP or coordinates)"):
+        place = st.text_input("PIN / ZIP code, or 'lat, lon'", value="", key="nearest_place")
+        if st.button("Find nearest", key="nearest_button") and place.strip():
+            parts = [p.strip() for p in place.split(",")]
+            try:
+                nearby = nearest_resources(float(parts[0]), float(parts[1])) if len(parts) == 2 else None
+            except ValueError:
+                nearby = None
+            if nearby is None:
+                nearby = nearest_resources_to_postal_code(place, country)
+            if not nearby:
+                st.warning("Could not place that location — try a 6-digit PIN, a 5-digit ZIP or 'lat, lon'.")
+            for km, r in nearby:
+                st.write(f"- **{r.get('name','Unknown')}** — {r.get('city','')}, {r.get('state','')} · {r.get('phone','N/A')} · ~{km:.0f} km")
 
     # Quick emergency panel
     st.subheader("Emergency & Immediate Help")
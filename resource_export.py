@@ -0,0 +1,126 @@
+# resource_export.py
+# Streaming bulk export of resources as a single .vcf (vCard 3.0) or CSV, optionally zipped.
+# Output is produced by generators and written chunk by chunk, so memory stays flat
+# whatever the export size. Used by show_psychiatrist_search_ui and from the command line:
+#
+#   python resource_export.py --country India --format vcf -o india.vcf
+#   python resource_export.py --country USA --state California --format csv --zip -o ca.zip
+#   python resource_export.py --query "psychiatrist in delhi" --format csv
+
+import csv
+import io
+import sys
+import zipfile
+
+import psychiatrist_db_module as db
+from resource_table import COORDINATE_FIELDS, ENTRY_FIELDS
+
+CSV_FIELDS = ENTRY_FIELDS + COORDINATE_FIELDS
+FORMATS = {"vcf": "text/vcard", "csv": "text/csv"}
+
+
+def region_entries(country: str = None, state: str = None):
+    """Iterate catalog entries for a whole country, one state, or everything (country=None)."""
+    index = db.get_resource_index()
+    for name, region in (("India", index.india), ("USA", index.usa)):
+        if country and country.lower() != name.lower():
+            continue
+        states = region.states()
+        if state is None:
+            for rows in states.values():
+                yield from rows
+        else:
+            yield from states.get(state, ())
+
+
+def iter_vcards(entries):
+    """One vCard per entry, built with db.make_vcard."""
+    for e in entries:
+        yield db.make_vcard(e) + "\n"
+
+
+def iter_csv(entries):
+    """Header line, then one CSV line per entry."""
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(CSV_FIELDS)
+    yield buf.getvalue()
+    for e in entries:
+        buf.seek(0)
+        buf.truncate()
+        writer.writerow([e.get(f, "") for f in CSV_FIELDS])
+        yield buf.getvalue()
+
+
+def iter_export(entries, fmt: str = "vcf"):
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format {fmt!r}; expected one of {sorted(FORMATS)}")
+    return iter_vcards(entries) if fmt == "vcf" else iter_csv(entries)
+
+
+def write_export(out, entries, fmt: str = "vcf", zipped: bool = False, arcname: str = None) -> int:
+    """
+    Stream the export into binary file object `out` (need not be seekable).
+    Returns the number of entries written.
+    """
+    count = 0
+
+    def counted():
+        nonlocal count
+        for e in entries:
+            count += 1
+            yield e
+
+    def chunks():
+        for chunk in iter_export(counted(), fmt):
+            yield chunk.encode("utf-8")
+
+    if zipped:
+        with zipfile.ZipFile(out, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+            with zf.open(arcname or f"resources.{fmt}", "w", force_zip64=True) as member:
+                for data in chunks():
+                    member.write(data)
+    else:
+        for data in chunks():
+            out.write(data)
+    return count
+
+
+def export_bytes(entries, fmt: str = "vcf", zipped: bool = False) -> bytes:
+    """Whole export in memory, for st.download_button (which needs the full payload)."""
+    buf = io.BytesIO()
+    write_export(buf, entries, fmt, zipped)
+    return buf.getvalue()
+
+
+def export_filename(stem: str, fmt: str, zipped: bool = False) -> str:
+    safe = "".join(ch if ch.isalnum() or ch in "-_" else "_" for ch in stem.strip()) or "resources"
+    return f"{safe}.{'zip' if zipped else fmt}"
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Export mental-health resources as vCard or CSV.")
+    parser.add_argument("--country", help="India or USA (default: both)")
+    parser.add_argument("--state", help="a single state, e.g. 'Delhi' or 'California'")
+    parser.add_argument("--query", help="export the results of a location search instead")
+    parser.add_argument("--format", choices=sorted(FORMATS), default="vcf")
+    parser.add_argument("--zip", action="store_true", help="write a .zip containing the export")
+    parser.add_argument("--catalog", nargs="*", default=[], help="provider dumps to import first")
+    parser.add_argument("-o", "--output", help="output file (default: stdout)")
+    args = parser.parse_args()
+
+    if args.catalog:
+        import resource_importer
+        resource_importer.import_catalog(args.catalog, include_builtin=True, warm=False)
+    if args.query:
+        selected = db.search_resources_cached(args.query, args.country or "India")
+    else:
+        selected = region_entries(args.country, args.state)
+
+    out = open(args.output, "wb") if args.output else sys.stdout.buffer
+    with out:
+        written = write_export(out, selected, args.format, args.zip,
+                               arcname=export_filename(args.state or args.country or args.query or "resources", args.format))
+    print(f"Exported {written} resource(s)", file=sys.stderr)
@@ -0,0 +1,187 @@
+# resource_importer.py
+# Streaming bulk import of provider dumps (CSV / JSONL, optionally gzipped) into the
+# resource catalog used by psychiatrist_db_module. Rows are parsed and validated one
+# at a time into a compact staging table, so neither the raw file nor a dict per row is kept.
+# The new catalog and its indexes are built off to the side and swapped in atomically.
+#
+# CLI (validate only, or install into this process with --install):
+#   python resource_importer.py providers.csv more_providers.jsonl.gz
+
+import csv
+import gzip
+import json
+import sys
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+
+import psychiatrist_db_module as db
+from geo_index import coordinates
+from resource_table import ResourceTable, TableRows
+
+USA_ALIASES = ["usa", "us", "united states", "america"]
+MAX_REPORTED_ERRORS = 50
+
+
+class ImportReport:
+    """Counts and the first few validation errors of one import."""
+
+    def __init__(self):
+        self.rows = 0
+        self.accepted = 0
+        self.rejected = 0
+        self.errors = []           # (source, line, message)
+        self.version = None        # DB version installed, if any
+
+    def reject(self, source, line, message):
+        self.rejected += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append((source, line, message))
+
+    def as_dict(self) -> dict:
+        return {"rows": self.rows, "accepted": self.accepted, "rejected": self.rejected,
+                "errors": [f"{s}:{l}: {m}" for s, l, m in self.errors], "version": self.version}
+
+
+def _open(path):
+    if str(path).endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8", newline="")
+    return open(path, encoding="utf-8", newline="")
+
+
+def iter_rows(path):
+    """Yield (line number, raw row dict) from a .csv or .jsonl/.ndjson file (optionally .gz)."""
+    name = str(path)[:-3] if str(path).endswith(".gz") else str(path)
+    with _open(path) as f:
+        if name.endswith(".csv"):
+            reader = csv.DictReader(f)
+            for row in reader:
+                yield reader.line_num, row
+        elif name.endswith((".jsonl", ".ndjson")):
+            for lineno, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except ValueError as e:
+                    yield lineno, e
+                    continue
+                yield lineno, row
+        else:
+            raise ValueError(f"Unsupported file type: {path} (expected .csv or .jsonl)")
+
+
+def validate_row(row):
+    """
+    Return (country, entry) for a raw row, or raise ValueError.
+    Entries follow db.ENTRY_FIELDS; optional lat/lon are kept when valid.
+    """
+    if not isinstance(row, dict):
+        raise ValueError("row is not an object")
+    entry = {}
+    for field in db.ENTRY_FIELDS:
+        value = row.get(field)
+        entry[field] = value.strip() if isinstance(value, str) else ("" if value is None else str(value))
+    if not entry["name"]:
+        raise ValueError("missing name")
+    if not entry["state"]:
+        raise ValueError("missing state")
+    entry["type"] = entry["type"].lower()
+    if entry["type"] not in db.ENTRY_TYPES:
+        raise ValueError(f"unknown type {entry['type']!r}")
+    if not entry["phone"] and not entry["telehealth_url"]:
+        raise ValueError("needs a phone or telehealth_url")
+    if entry["telehealth_url"] and not entry["telehealth_url"].startswith(("http://", "https://")):
+        raise ValueError("telehealth_url must be http(s)")
+
+    if row.get("lat") not in (None, "") or row.get("lon") not in (None, ""):
+        latlon = coordinates(row)
+        if latlon is None:
+            raise ValueError("invalid lat/lon")
+        entry["lat"], entry["lon"] = latlon
+    elif entry["city"] in db.CITY_COORDINATES:
+        entry["lat"], entry["lon"] = db.CITY_COORDINATES[entry["city"]]
+
+    country = str(row.get("country") or "").strip().lower()
+    if country:
+        usa = country in USA_ALIASES
+    else:
+        usa = entry["state"] in db.US_STATES or entry["state"].lower() in USA_ALIASES
+    return ("USA" if usa else "India"), entry
+
+
+def build_catalog(paths, report=None, include_builtin=False):
+    """
+    Stream every file into new {state: rows} dicts for India and the USA, backed by one
+    staging ResourceTable. The built-in US 'national' helplines are always carried over
+    unless the dump defines them.
+    """
+    report = report or ImportReport()
+    staging = ResourceTable()
+    catalog = {"India": {}, "USA": {}}
+
+    def add(country, state, entry):
+        catalog[country].setdefault(state, array("I")).append(staging.append(entry))
+
+    if include_builtin:
+        for country, states in (("India", db.INDIA_STATE_RESOURCES), ("USA", db.USA_STATE_RESOURCES)):
+            for state, items in states.items():
+                for e in items:
+                    add(country, state, e)
+
+    for path in paths:
+        for lineno, row in iter_rows(path):
+            report.rows += 1
+            if isinstance(row, Exception):
+                report.reject(path, lineno, str(row))
+                continue
+            try:
+                country, entry = validate_row(row)
+            except ValueError as e:
+                report.reject(path, lineno, str(e))
+                continue
+            add(country, entry["state"], entry)
+            report.accepted += 1
+
+    if "national" not in catalog["USA"] and "national" in db.USA_STATE_RESOURCES:
+        imported, catalog["USA"] = catalog["USA"], {}
+        for e in db.USA_STATE_RESOURCES["national"]:
+            add("USA", "national", e)
+        catalog["USA"].update(imported)
+    staging.pool.seal()
+    return ({state: TableRows(staging, rows) for state, rows in catalog["India"].items()},
+            {state: TableRows(staging, rows) for state, rows in catalog["USA"].items()},
+            report)
+
+
+def import_catalog(paths, include_builtin=False, warm=True) -> ImportReport:
+    """Load, validate and index the dumps, then atomically install them as the live catalog."""
+    india, usa, report = build_catalog(paths, include_builtin=include_builtin)
+    if report.accepted:
+        report.version = db.install_catalog(india, usa, warm=warm).version
+    return report
+
+
+# One import at a time; searches keep running against the current catalog meanwhile
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="catalog-import")
+
+def import_catalog_async(paths, include_builtin=False, warm=True):
+    """Run import_catalog in the background; returns a Future resolving to its ImportReport."""
+    return _executor.submit(import_catalog, list(paths), include_builtin, warm)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Validate (and optionally install) provider dumps.")
+    parser.add_argument("files", nargs="+", help=".csv / .jsonl files, optionally .gz")
+    parser.add_argument("--include-builtin", action="store_true", help="keep the built-in entries")
+    parser.add_argument("--install", action="store_true", help="install and build indexes in this process")
+    args = parser.parse_args()
+
+    if args.install:
+        result = import_catalog(args.files, include_builtin=args.include_builtin)
+    else:
+        result = build_catalog(args.files, include_builtin=args.include_builtin)[2]
+    json.dump(result.as_dict(), sys.stdout, indent=2)
+    print()
+    sys.exit(1 if result.rejected and not result.accepted else 0)
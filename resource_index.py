@@ -0,0 +1,487 @@
+# resource_index.py
+# Prebuilt lookup structures for psychiatrist_db_module.search_resources_by_location.
+# The index is built once per DB version, so a query costs roughly the same
+# whether the resource dicts hold 80 entries or 500k.
+
+import re
+import threading
+from array import array
+from bisect import bisect_left
+from collections import Counter, OrderedDict
+from functools import cached_property
+from types import MappingProxyType
+
+from geo_index import GeoIndex, coordinates
+from resource_table import ResourceRow, ResourceTable, TableRows
+
+_MAX_CHAR = "\U0010ffff"
+_OFFSET_BITS = 16
+_OFFSET_MASK = (1 << _OFFSET_BITS) - 1
+
+
+def normalize(s: str) -> str:
+    return s.strip().lower() if isinstance(s, str) else ""
+
+
+class SubstringIndex:
+    """
+    Sorted suffixes of a list of keys (a generalized suffix array).
+    Every key containing q has a suffix starting with q, so "which keys contain q"
+    is two binary searches plus the size of the answer.
+    """
+
+    def __init__(self, keys):
+        self.keys = keys
+        suffixes = [(kid << _OFFSET_BITS) | off
+                    for kid, key in enumerate(keys)
+                    for off in range(min(len(key), _OFFSET_MASK))]
+        suffixes.sort(key=self._suffix)
+        self._suffixes = array("q", suffixes)
+
+    def _suffix(self, packed):
+        return self.keys[packed >> _OFFSET_BITS][packed & _OFFSET_MASK:]
+
+    def containing(self, q: str):
+        """Ids of keys that contain q (all keys for an empty q)."""
+        if not q:
+            return set(range(len(self.keys)))
+        lo = bisect_left(self._suffixes, q, key=self._suffix)
+        hi = bisect_left(self._suffixes, q + _MAX_CHAR, lo, key=self._suffix)
+        return {packed >> _OFFSET_BITS for packed in self._suffixes[lo:hi]}
+
+
+class RegionIndex:
+    """Index over one country dict ({state: [entries]}); entries are copied into the shared table."""
+
+    def __init__(self, states, table):
+        self.table = table
+        self.state_keys = []       # normalized state name, by state id
+        self.state_rows = []       # range of entry positions, by state id
+        self.state_ids = {}        # original state key -> state id
+        city_ids = {}
+        self.city_rows = []        # entry positions, by city id
+
+        for state, items in states.items():
+            start = len(table)
+            for e in items:
+                city = normalize(e.get("city", ""))
+                cid = city_ids.get(city)
+                if cid is None:
+                    cid = city_ids[city] = len(self.city_rows)
+                    self.city_rows.append(array("I"))
+                self.city_rows[cid].append(table.append(e))
+            self.state_ids[state] = len(self.state_keys)
+            self.state_keys.append(normalize(state))
+            self.state_rows.append(range(start, len(table)))
+
+        self._states_by_key = {}
+        for sid, key in enumerate(self.state_keys):
+            self._states_by_key.setdefault(key, []).append(sid)
+        self._state_lengths = sorted({len(k) for k in self.state_keys})
+        self._state_substrings = SubstringIndex(self.state_keys)
+        self._city_substrings = SubstringIndex(list(city_ids))
+
+    def states_containing(self, q: str):
+        """State ids whose normalized name contains q (q in state)."""
+        return self._state_substrings.containing(q)
+
+    def states_in(self, q: str):
+        """State ids whose normalized name occurs in q (state in q), by probing q's substrings."""
+        found = set()
+        for length in self._state_lengths:
+            if length > len(q):
+                break
+            for i in range(len(q) - length + 1):
+                found.update(self._states_by_key.get(q[i:i + length], ()))
+        return found
+
+    def city_matches(self, q: str):
+        """Entry positions whose normalized city contains q."""
+        rows = []
+        for cid in self._city_substrings.containing(q):
+            rows.extend(self.city_rows[cid])
+        return rows
+
+    def rows(self, state):
+        sid = self.state_ids.get(state)
+        return self.state_rows[sid] if sid is not None else range(0)
+
+    def states(self):
+        """{state: row views} over the table, in the same shape as the source dict."""
+        return {state: TableRows(self.table, self.state_rows[sid]) for state, sid in self.state_ids.items()}
+
+    def match(self, matched_states, q: str):
+        """Sorted positions: every entry of matched states, plus city matches elsewhere."""
+        positions = set(self.city_matches(q))
+        for sid in matched_states:
+            positions.update(self.state_rows[sid])
+        return sorted(positions)
+
+
+class ResourceIndex:
+    """
+    Lookup structures over INDIA_STATE_RESOURCES / USA_STATE_RESOURCES for one DB version.
+    Entries are stored once in a compact ResourceTable; `entries` are read-only row views.
+    `extra` entries get positions too but belong to no state (e.g. synthetic fallbacks).
+    """
+
+    def __init__(self, india_states, usa_states, extra=(), version=0):
+        self.version = version
+        self.table = ResourceTable()
+        self.india = RegionIndex(india_states, self.table)
+        self.usa = RegionIndex(usa_states, self.table)
+        start = len(self.table)
+        for e in extra:
+            self.table.append(e)
+        self.extra_rows = range(start, len(self.table))
+        self.table.pool.seal()
+        self.entries = self.table.rows()
+
+    def match_india(self, q: str):
+        # q == state, q in state or state in q; otherwise q in city
+        return self.india.match(self.india.states_containing(q) | self.india.states_in(q), q)
+
+    def match_usa(self, q: str):
+        # state in q or q == state; otherwise q in city
+        return self.usa.match(self.usa.states_in(q), q)
+
+    @cached_property
+    def fuzzy(self) -> "TrigramIndex":
+        # built on first fuzzy query; exact-only deployments never pay for it
+        return TrigramIndex(self.entries)
+
+    @cached_property
+    def geo(self) -> GeoIndex:
+        # entries without lat/lon (e.g. national helplines) are simply not in it
+        points = []
+        for pos, e in enumerate(self.entries):
+            latlon = coordinates(e)
+            if latlon is not None:
+                points.append((pos, latlon[0], latlon[1]))
+        return GeoIndex(points)
+
+    @cached_property
+    def facets(self) -> "FacetIndex":
+        return FacetIndex(self)
+
+    def get(self, positions):
+        table = self.table
+        return [ResourceRow(table, p) for p in positions]
+
+
+# ---------------------------
+# Typo-tolerant search
+# ---------------------------
+_WORD_SPLIT = re.compile(r"[^0-9a-z]+")
+FUZZY_FIELDS = {"city": 1.0, "state": 1.0, "name": 0.8}
+QUERY_STOPWORDS = {"psychiatrist", "psychiatrists", "doctor", "doctors", "therapist", "therapists",
+                   "counsellor", "counselor", "find", "help", "near", "me", "in", "at", "the", "of", "for"}
+# Former / colloquial city names that share too few trigrams with the official one
+LOCATION_ALIASES = {"bangalore": "bengaluru", "bombay": "mumbai", "madras": "chennai",
+                    "calcutta": "kolkata", "trivandrum": "thiruvananthapuram", "poona": "pune",
+                    "gurgaon": "gurugram", "orissa": "odisha", "pondicherry": "puducherry"}
+
+
+def words(s: str):
+    return [w for w in _WORD_SPLIT.split(normalize(s)) if w]
+
+
+def trigrams(word: str):
+    padded = f"  {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class TrigramIndex:
+    """
+    Character-trigram index over the words of each entry's name, city and state, plus
+    multi-word city and state values. Candidate terms come from the query's rarest
+    posting lists, capped at max_terms, and are scored by Dice similarity, so query
+    cost is bounded whatever the catalog size.
+    """
+
+    def __init__(self, entries, max_candidates=5000, max_terms=2000):
+        self.max_candidates = max_candidates
+        self.max_terms = max_terms
+        self.terms = []            # (field, term) by term id
+        self.term_grams = []       # trigram count, by term id
+        self.term_rows = []        # entry positions, by term id
+        self.display = {}          # term id -> original city/state spelling
+        self._postings = {}        # trigram -> [term ids]
+        term_ids = {}
+
+        for pos, e in enumerate(entries):
+            for field in FUZZY_FIELDS:
+                value = e.get(field, "")
+                parts = words(value)
+                if field == "name":
+                    # numbers in names ("Clinic 42") are unique per row and never location typos
+                    parts = [w for w in parts if not w.isdigit()]
+                elif len(parts) > 1:
+                    parts.append(" ".join(parts))
+                for term in parts:
+                    key = (field, term)
+                    tid = term_ids.get(key)
+                    if tid is None:
+                        tid = term_ids[key] = len(self.terms)
+                        self.terms.append(key)
+                        grams = trigrams(term)
+                        self.term_grams.append(len(grams))
+                        self.term_rows.append([])
+                        for g in grams:
+                            self._postings.setdefault(g, []).append(tid)
+                        if field != "name" and term == " ".join(words(value)):
+                            self.display[tid] = value.strip()
+                    rows = self.term_rows[tid]
+                    if not rows or rows[-1] != pos:
+                        rows.append(pos)
+
+    def similar_terms(self, token: str, min_score=0.3):
+        """
+        [(score, term id)] for terms sharing enough trigrams with token, best first.
+        Posting lists are read rarest first until max_terms candidates are collected; the
+        common trigrams skipped that way only ever add weak matches.
+        """
+        grams = trigrams(token)
+        candidates = set()
+        for postings in sorted((self._postings.get(g, ()) for g in grams), key=len):
+            room = self.max_terms - len(candidates)
+            if len(postings) > room:
+                if not candidates:
+                    candidates.update(postings[:room])
+                break
+            candidates.update(postings)
+        scored = []
+        terms = self.terms
+        for tid in candidates:
+            padded = f"  {terms[tid][1]} "
+            n = sum(1 for g in grams if g in padded)
+            score = 2.0 * n / (len(grams) + self.term_grams[tid])
+            if score >= min_score:
+                scored.append((score, tid))
+        scored.sort(key=lambda st: (-st[0], st[1]))
+        return scored
+
+    def query_tokens(self, query: str):
+        """Non-stopword words of the query (aliases applied), plus the joined phrase if multi-word."""
+        tokens = words(query)
+        kept = [LOCATION_ALIASES.get(w, w) for w in tokens if w not in QUERY_STOPWORDS] or tokens
+        return kept, (" ".join(kept) if len(kept) > 1 else None)
+
+    def search(self, query: str, top_k=10, min_score=0.3, prefer=None, allowed=None):
+        """
+        Ranked [(score, position)] for the best top_k entries. An entry scores the better of
+        its mean best-term similarity over the query words and the similarity of the whole
+        phrase to one of its multi-word values. `prefer` is a range of positions that wins ties;
+        `allowed` (position -> bool) drops entries before the top_k cut.
+        """
+        kept, phrase = self.query_tokens(query)
+        if not kept:
+            return []              # nothing to match ("???", "-", emoji)
+        word_scores = {}           # position -> {word index: best weighted score}
+        phrase_scores = {}         # position -> best weighted phrase score
+        tokens = kept + ([phrase] if phrase else [])
+        budget = max(1, self.max_candidates // len(tokens))       # rows visited per token
+        for ti, token in enumerate(tokens):
+            visited = 0
+            for score, tid in self.similar_terms(token, min_score):
+                field, term = self.terms[tid]
+                if token is phrase and " " not in term:
+                    continue
+                weighted = score * FUZZY_FIELDS[field]
+                rows = self.term_rows[tid][:budget - visited]
+                for pos in rows:
+                    if token is phrase:
+                        if phrase_scores.get(pos, 0.0) < weighted:
+                            phrase_scores[pos] = weighted
+                    else:
+                        per_word = word_scores.setdefault(pos, {})
+                        if per_word.get(ti, 0.0) < weighted:
+                            per_word[ti] = weighted
+                visited += len(rows)
+                if visited >= budget:
+                    break
+        scores = {pos: sum(s.values()) / len(kept) for pos, s in word_scores.items()}
+        for pos, score in phrase_scores.items():
+            if score > scores.get(pos, 0.0):
+                scores[pos] = score
+        prefer = prefer if prefer is not None else range(0)
+        ranked = sorted(((score, pos) for pos, score in scores.items() if allowed is None or allowed(pos)),
+                        key=lambda sp: (-sp[0], sp[1] not in prefer, sp[1]))
+        return ranked[:top_k]
+
+    def suggest(self, query: str, limit=3, min_score=0.3):
+        """City/state spellings closest to the query, for "did you mean" prompts."""
+        kept, phrase = self.query_tokens(query)
+        typed = set(words(query))
+        suggestions = []
+        for token in ([phrase] if phrase else []) + kept:
+            for score, tid in self.similar_terms(token, min_score):
+                name = self.display.get(tid)
+                if name and name not in suggestions and normalize(name) not in typed:
+                    suggestions.append(name)
+                    if len(suggestions) >= limit:
+                        return suggestions
+        return suggestions
+
+
+# ---------------------------
+# Faceted filtering
+# ---------------------------
+class FacetIndex:
+    """
+    Per-row facet codes in compact arrays (the table's own type/telehealth string-id
+    columns plus one region code per row). Counts and filters walk only the positions
+    they are given, so their cost follows the result size, not the catalog size;
+    whole-catalog counts are tallied once per DB version.
+    Facets: type (entry type), telehealth (True/False), country ("India"/"USA"), state.
+    """
+
+    FACETS = ("type", "telehealth", "country", "state")
+
+    def __init__(self, index):
+        table = index.table
+        strings = table.pool.strings
+        self.size = len(table)
+        self._type = table.columns["type"]
+        self._tele = table.columns["telehealth_url"]
+        self._type_of = {sid: normalize(strings[sid] or "") for sid in set(self._type)}
+        self._no_url = frozenset(sid for sid in (0, *set(self._tele)) if not strings[sid])
+
+        # region code per row: index into _regions [(country, state)]; 0 = neither
+        self._regions = [(None, None)]
+        self._region = array("I", [0]) * self.size
+        def assign(rows, country, state):
+            code = len(self._regions)
+            self._regions.append((country, state))
+            self._region[rows.start:rows.stop] = array("I", [code]) * len(rows)
+        for country, region in (("India", index.india), ("USA", index.usa)):
+            for state, sid in region.state_ids.items():
+                assign(region.state_rows[sid], country, state)
+        # extra rows (the India national helpline fallback) belong to no state but are Indian
+        assign(index.extra_rows, "India", None)
+
+        self._values = {
+            "type": sorted({v for v in self._type_of.values() if v}),
+            "telehealth": [True, False],
+            "country": ["India", "USA"],
+            "state": list(dict.fromkeys(state for _, state in self._regions if state)),
+        }
+        self.catalog_counts = self._tally(Counter(self._type), Counter(self._tele), Counter(self._region))
+
+    def _tally(self, types, teles, regions):
+        counts = {facet: dict.fromkeys(values, 0) for facet, values in self._values.items()}
+        for sid, n in types.items():
+            value = self._type_of[sid]
+            if value:
+                counts["type"][value] += n
+        for sid, n in teles.items():
+            counts["telehealth"][sid not in self._no_url] += n
+        for code, n in regions.items():
+            country, state = self._regions[code]
+            if country:
+                counts["country"][country] += n
+            if state:
+                counts["state"][state] += n
+        return counts
+
+    def counts(self, positions=None) -> dict:
+        """{facet: {value: count}} over positions (e.g. a result), or over the whole catalog."""
+        if positions is None:
+            return {facet: dict(values) for facet, values in self.catalog_counts.items()}
+        if not isinstance(positions, (list, tuple, range, array)):
+            positions = list(positions)
+        return self._tally(Counter(map(self._type.__getitem__, positions)),
+                           Counter(map(self._tele.__getitem__, positions)),
+                           Counter(map(self._region.__getitem__, positions)))
+
+    def predicate(self, filters):
+        """
+        Callable position -> bool for {facet: value or [values]} (values OR'd within a facet,
+        facets AND'd), or None when nothing is filtered. Setup never touches the catalog.
+        """
+        tests = []                 # (column, codes, wanted inside codes)
+        for facet, values in (filters or {}).items():
+            if facet not in self.FACETS:
+                raise ValueError(f"Unknown facet {facet!r}; expected one of {self.FACETS}")
+            if values is None:
+                continue
+            if isinstance(values, (str, bool)):
+                values = [values]
+            if facet == "type":
+                wanted = {normalize(v) for v in values}
+                tests.append((self._type, {sid for sid, v in self._type_of.items() if v in wanted}, True))
+            elif facet == "telehealth":
+                wanted = {bool(v) for v in values}
+                if len(wanted) == 1:
+                    tests.append((self._tele, self._no_url, False in wanted))
+                elif not wanted:
+                    return lambda p: False
+            else:
+                i = 0 if facet == "country" else 1
+                codes = {code for code, key in enumerate(self._regions) if key[i] is not None and key[i] in values}
+                tests.append((self._region, codes, True))
+        if not tests:
+            return None
+        return lambda p: all((column[p] in codes) == inside for column, codes, inside in tests)
+
+    def filter(self, positions, filters):
+        """Positions (in order) that satisfy filters."""
+        allowed = self.predicate(filters)
+        return list(positions) if allowed is None else [p for p in positions if allowed(p)]
+
+
+# ---------------------------
+# Query result cache
+# ---------------------------
+def freeze_results(entries):
+    """Immutable result list: a tuple of read-only views, safe to share between sessions."""
+    return tuple(e if isinstance(e, (MappingProxyType, ResourceRow)) else MappingProxyType(e) for e in entries)
+
+
+class QueryCache:
+    """
+    Bounded LRU of search results for one DB version. Looking up with a different
+    version drops every entry, so results never outlive the index they came from.
+    """
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self.version = None
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = self.invalidations = 0
+
+    def get(self, key, version):
+        with self._lock:
+            if version != self.version:
+                if self._data:
+                    self.invalidations += 1
+                self._data.clear()
+                self.version = version
+            value = self._data.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value, version):
+        with self._lock:
+            if version != self.version:
+                return
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {"size": len(self._data), "maxsize": self.maxsize, "hits": self.hits, "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0, "evictions": self.evictions,
+                "invalidations": self.invalidations, "version": self.version}
@@ -0,0 +1,158 @@
+# resource_table.py
+# Compact, column-oriented storage for the provider catalog.
+# Each string field is an array of ids into a shared pool of interned strings, and
+# coordinates are float arrays, so a row costs a few dozen bytes instead of a dict.
+# ResourceRow is a light read-only Mapping view, so code written against entry
+# dicts (entry.get("name"), entry["city"], dict(entry)) keeps working unchanged.
+
+import math
+from array import array
+from collections.abc import Mapping, Sequence
+
+ENTRY_FIELDS = ("name", "type", "phone", "address", "city", "state", "telehealth_url", "notes")
+COORDINATE_FIELDS = ("lat", "lon")
+
+_ABSENT = 0                # string id for "key not present in the source entry"
+
+
+class StringPool:
+    """Interned strings by id. The lookup dict is only needed while rows are being added."""
+
+    def __init__(self):
+        self.strings = [None]
+        self._ids = {}
+
+    def __len__(self):
+        return len(self.strings) - 1
+
+    def intern(self, s) -> int:
+        if s is None:
+            return _ABSENT
+        if not isinstance(s, str):
+            s = str(s)
+        if self._ids is None:
+            raise RuntimeError("StringPool is sealed")
+        sid = self._ids.get(s)
+        if sid is None:
+            sid = self._ids[s] = len(self.strings)
+            self.strings.append(s)
+        return sid
+
+    def seal(self):
+        """Drop the interning dict once the table is complete."""
+        self._ids = None
+
+
+class ResourceTable:
+    """
+    Append-only table of resource entries. Only ENTRY_FIELDS and lat/lon are stored;
+    other keys of the source mappings are dropped.
+    """
+
+    def __init__(self, pool=None):
+        self.pool = pool if pool is not None else StringPool()
+        self.columns = {field: array("I") for field in ENTRY_FIELDS}
+        self.coordinates = {field: array("d") for field in COORDINATE_FIELDS}
+
+    def __len__(self):
+        return len(self.columns["name"])
+
+    def append(self, entry) -> int:
+        """Add one entry mapping; returns its position."""
+        pos = len(self)
+        intern = self.pool.intern
+        get = entry.get
+        for field, column in self.columns.items():
+            column.append(intern(get(field)))
+        for field, column in self.coordinates.items():
+            value = get(field)
+            try:
+                column.append(float(value) if value not in (None, "") else math.nan)
+            except (TypeError, ValueError):
+                column.append(math.nan)
+        return pos
+
+    def value(self, pos: int, field: str):
+        """Field value of row pos; raises KeyError when the row has no such field."""
+        column = self.columns.get(field)
+        if column is not None:
+            s = self.pool.strings[column[pos]]
+            if s is None:
+                raise KeyError(field)
+            return s
+        column = self.coordinates.get(field)
+        if column is None or math.isnan(column[pos]):
+            raise KeyError(field)
+        return column[pos]
+
+    def row(self, pos: int) -> "ResourceRow":
+        if not 0 <= pos < len(self):
+            raise IndexError(pos)
+        return ResourceRow(self, pos)
+
+    def rows(self, positions=None) -> "TableRows":
+        return TableRows(self, range(len(self)) if positions is None else positions)
+
+    def nbytes(self) -> int:
+        """Approximate memory held by the id/coordinate columns (excluding the string pool)."""
+        columns = list(self.columns.values()) + list(self.coordinates.values())
+        return sum(c.itemsize * len(c) for c in columns)
+
+
+class ResourceRow(Mapping):
+    """Read-only dict-like view of one table row."""
+
+    __slots__ = ("_table", "_pos")
+
+    def __init__(self, table, pos):
+        self._table = table
+        self._pos = pos
+
+    @property
+    def position(self) -> int:
+        """Row number in its table (stable for one DB version)."""
+        return self._pos
+
+    def __getitem__(self, field):
+        return self._table.value(self._pos, field)
+
+    def __iter__(self):
+        for field in ENTRY_FIELDS + COORDINATE_FIELDS:
+            if field in self:
+                yield field
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __contains__(self, field):
+        try:
+            self._table.value(self._pos, field)
+        except KeyError:
+            return False
+        return True
+
+    def __repr__(self):
+        return f"ResourceRow({dict(self)!r})"
+
+
+class TableRows(Sequence):
+    """Sequence of row views over selected positions (a range, array or list)."""
+
+    __slots__ = ("table", "positions")
+
+    def __init__(self, table, positions):
+        self.table = table
+        self.positions = positions
+
+    def __len__(self):
+        return len(self.positions)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return TableRows(self.table, self.positions[i])
+        return ResourceRow(self.table, self.positions[i])
+
+    def __iter__(self):
+        table = self.table
+        for pos in self.positions:
+            yield ResourceRow(table, pos)
@@ -0,0 +1,69 @@
+# tests/test_api_server.py
+
+import json
+
+import pytest
+
+import api_server
+import psychiatrist_db_module as db
+
+
+def post(target, payload):
+    status, _, body = api_server.dispatch("POST", target, json.dumps(payload).encode())
+    return status, json.loads(body)
+
+
+@pytest.mark.parametrize("texts", ["hello", 5, None, {"a": "b"}, ["ok", 1]])
+def test_triage_rejects_texts_that_are_not_a_list_of_strings(texts):
+    status, body = post("/triage", {"texts": texts})
+    assert status == 400
+    assert body == {"error": "texts must be a list of strings"}
+
+
+@pytest.fixture
+def admin(monkeypatch):
+    india, usa = dict(db.INDIA_STATE_RESOURCES), dict(db.USA_STATE_RESOURCES)
+    monkeypatch.setattr(api_server, "ADMIN_TOKEN", "secret")
+    yield "secret"
+    db.install_catalog(india, usa, warm=False)
+
+
+def test_import_is_off_without_an_admin_token(monkeypatch):
+    monkeypatch.setattr(api_server, "ADMIN_TOKEN", None)
+    assert post("/import", {"paths": ["x.csv"]})[0] == 404
+
+
+def test_import_rejects_a_wrong_token(admin):
+    assert post("/import", {"token": "guess", "paths": ["x.csv"]})[0] == 403
+
+
+def test_import_installs_a_dump_and_reports_it(admin, tmp_path):
+    dump = tmp_path / "providers.jsonl"
+    dump.write_text(json.dumps({"name": "Zyxwv Clinic", "type": "clinic", "phone": "+91-1234567890",
+                                "city": "Pune", "state": "Maharashtra"}) + "\n{not json\n", encoding="utf-8")
+    status, job = post("/import", {"token": admin, "paths": [str(dump)], "include_builtin": True})
+    assert status == 200 and job["status"] in ("running", "done")
+    api_server._import_jobs[job["job"]].result(timeout=60)
+
+    status, _, body = api_server.dispatch("GET", f"/import?job={job['job']}&token={admin}", "")
+    report = json.loads(body)
+    assert status == 200 and report["status"] == "done"
+    assert report["report"]["accepted"] == 1 and report["report"]["rejected"] == 1
+    assert report["report"]["version"] == db.get_resource_index().version
+    assert any(e["name"] == "Zyxwv Clinic" for e in db.search_resources_by_location("Pune"))
+
+
+def test_triage_batch_flags_only_the_crisis_message():
+    status, body = post("/triage", {"texts": ["I feel fine today", "I want to kill myself"]})
+    assert status == 200
+    assert [r["tier"] for r in body["results"]] == [None, "crisis"]
+
+
+@pytest.mark.parametrize("method, target, body", [
+    ("POST", "/triage", json.dumps({"text": "I want to kill myself"})),
+    ("GET", "/triage?text=I%20want%20to%20kill%20myself", ""),
+])
+def test_triage_single_text(method, target, body):
+    status, _, payload = api_server.dispatch(method, target, body)
+    assert status == 200
+    assert json.loads(payload)["tier"] == "crisis"
@@ -0,0 +1,16 @@
+# tests/test_crisis_detector.py
+
+import pytest
+
+from crisis_detector import default_detector
+
+
+@pytest.mark.parametrize("text, start", [("Straße stress", 7), ("İİ stress", 3), ("stress", 0)])
+def test_match_offsets_index_the_original_text(text, start):
+    [match] = default_detector().scan(text).matches
+    assert match.start == start and text[start:start + 6] == "stress"
+
+
+@pytest.mark.parametrize("text", ["I can’t sleep", "I can‘t sleep", "I CAN'T  sleep"])
+def test_curly_apostrophes_match(text):
+    assert [m.phrase for m in default_detector().scan(text).matches] == ["can't sleep"]
@@ -0,0 +1,15 @@
+# tests/test_mood_tracker.py
+
+from datetime import date, timedelta
+
+from mood_tracker import MoodTracker
+
+
+def test_backfilled_day_joins_the_runs_on_both_sides():
+    tracker = MoodTracker(":memory:")
+    day = date(2026, 1, 1)
+    for offset in (0, 1, 3, 4, 5, 10):
+        tracker.log("u", 5, when=day + timedelta(offset))
+    summary = tracker.log("u", 5, when=day + timedelta(2))
+    assert summary["best_streak"] == 6
+    assert tracker.summary("u", today=day + timedelta(10))["streak"] == 1
@@ -0,0 +1,15 @@
+# tests/test_resource_index.py
+
+import pytest
+
+import psychiatrist_db_module as db
+
+
+@pytest.mark.parametrize("query", ["???", "-", "🙂", "   "])
+def test_fuzzy_search_without_word_characters_returns_nothing(query):
+    assert db.search_resources_fuzzy(query) == []
+    assert db.suggest_locations(query) == []
+
+
+def test_fuzzy_search_still_finds_typos():
+    assert any(e["city"] == "Hyderabad" for e in db.search_resources_fuzzy("hydrabad"))